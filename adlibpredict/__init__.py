@@ -1,10 +1,34 @@
 from adlibpredict._objects import (
     FrameCollector,
+    FrameLease,
+    Detection,
     Detector,
+    Letterbox,
+    gst_pipeline,
+  )
+from adlibpredict._motion import (
+    MotionGate,
+  )
+from adlibpredict._pool import (
+    CollectorPool,
+  )
+from adlibpredict._pipeline import (
+    LatestQueue,
+    Pipeline,
+    StageStats,
   )
 
 
 __all__ = [
+  "CollectorPool",
+  "Detection",
   "Detector",
   "FrameCollector",
+  "FrameLease",
+  "LatestQueue",
+  "Letterbox",
+  "MotionGate",
+  "Pipeline",
+  "StageStats",
+  "gst_pipeline",
 ]
@@ -0,0 +1,112 @@
+import cv2
+import numpy as np
+
+
+class MotionGate:
+  # cheap frame differencing on a downscaled grayscale copy, decides whether
+  # a frame is worth running the detector on
+  def __init__(
+    self,
+    threshold=0.01,     # fraction of changed pixels that counts as motion
+    pixel_delta=25,     # per-pixel grayscale change that counts as changed
+    max_skip=2.0,       # seconds, inference is forced at least this often
+    width=160,
+    crop=False,
+    margin=0.1,         # roi padding, fraction of the frame size
+    min_roi=0.25,       # roi side floor, fraction of the frame size
+  ):
+    self.threshold = threshold
+    self.pixel_delta = pixel_delta
+    self.max_skip = max_skip
+    self.width = width
+    self.crop = crop
+    self.margin = margin
+    self.min_roi = min_roi
+    self._gray = None
+    self._small = None
+    self._ref = None    # small frame at the last inference
+    self._diff = None
+    self._last_run = None
+    self.score = 0.0
+    self.skipped = 0
+
+  def _downscale(
+    self,
+    frame,
+  ):
+    h, w = frame.shape[:2]
+    size = (self.width, max(1, round(h * self.width / w)))
+    if self._small is None or self._small.shape[::-1] != size:
+      self._gray = np.empty((h, w), dtype=np.uint8)
+      self._small = np.empty(size[::-1], dtype=np.uint8)
+      self._ref = None
+    elif self._gray.shape != (h, w):
+      self._gray = np.empty((h, w), dtype=np.uint8)
+    cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self._gray)
+    cv2.resize(
+      self._gray,
+      size,
+      dst=self._small,
+      interpolation=cv2.INTER_AREA,
+    )
+    return self._small
+
+  def _roi(
+    self,
+    mask,
+    frame_shape,
+  ):   # (x1, y1, x2, y2) in frame coords
+    h, w = frame_shape[:2]
+    sh, sw = mask.shape
+    ys, xs = np.nonzero(mask)
+    sx, sy = w / sw, h / sh
+    x1, x2 = xs.min() * sx, (xs.max() + 1) * sx
+    y1, y2 = ys.min() * sy, (ys.max() + 1) * sy
+    mx, my = self.margin * w, self.margin * h
+    x1, y1, x2, y2 = x1 - mx, y1 - my, x2 + mx, y2 + my
+    min_w, min_h = self.min_roi * w, self.min_roi * h
+    if x2 - x1 < min_w:
+      cx = (x1 + x2) / 2
+      x1, x2 = cx - min_w / 2, cx + min_w / 2
+    if y2 - y1 < min_h:
+      cy = (y1 + y2) / 2
+      y1, y2 = cy - min_h / 2, cy + min_h / 2
+    return (
+      int(max(0, x1)),
+      int(max(0, y1)),
+      int(min(w, x2)),
+      int(min(h, y2)),
+    )
+
+  def check(
+    self,
+    frame,
+    ts,
+  ):   # (run, roi | None); roi only when crop is enabled
+    small = self._downscale(frame)
+    forced = (
+      self._ref is None
+      or self._last_run is None
+      or ts - self._last_run >= self.max_skip
+    )
+    roi = None
+    if self._ref is None:
+      self.score = 1.0
+    else:
+      if self._diff is None or self._diff.shape != small.shape:
+        self._diff = np.empty_like(small)
+      cv2.absdiff(small, self._ref, dst=self._diff)
+      mask = self._diff > self.pixel_delta
+      self.score = float(mask.mean())
+      if self.crop and not forced and self.score >= self.threshold:
+        roi = self._roi(mask, frame.shape)
+    if not forced and self.score < self.threshold:
+      self.skipped += 1
+      return (False, None)
+    # the reference only moves on inference, so slow drift still adds up
+    if self._ref is None:
+      self._ref = small.copy()
+    else:
+      np.copyto(self._ref, small)
+    self._last_run = ts
+    return (True, roi)
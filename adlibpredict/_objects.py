@@ -1,26 +1,164 @@
-import copy
+import os
 import cv2
 import time
 import threading
+import numpy as np
 from rich import print
-from ultralytics import YOLO
+
+
+DEFAULT_MIN_CONF = 0.3
+DEFAULT_FPS = 30.0
+
+
+def _as_classes(
+  class_id,
+  min_conf,
+):
+  # class_id: int | iterable of ints | None (-> keys of a min_conf map)
+  if class_id is None:
+    if not isinstance(min_conf, dict):
+      raise ValueError("class_id is None but min_conf is not a per-class map.")
+    return np.fromiter(min_conf.keys(), dtype=np.int64)
+  if isinstance(class_id, (int, np.integer)):
+    return np.array([class_id], dtype=np.int64)
+  return np.fromiter(class_id, dtype=np.int64)
+
+
+class Detection:
+  def __init__(
+    self,
+    ts,
+    cls,
+    conf,
+    xyxy,
+    stream=None,
+  ):
+    self.ts = ts
+    self.cls = cls
+    self.conf = conf
+    self.xyxy = xyxy
+    self.stream = stream
+
+  def __repr__(self):
+    stream = "" if self.stream is None else f"stream={self.stream}, "
+    return (
+      f"Detection({stream}ts={self.ts}, cls={self.cls}, "
+      f"conf={self.conf:.2f}, xyxy={self.xyxy})"
+    )
+
+
+class FrameLease:
+  def __init__(
+    self,
+    collector,
+    slot,
+    seq,
+    ts,
+    frame,
+  ):
+    self._collector = collector
+    self._slot = slot
+    self.seq = seq
+    self.ts = ts
+    self.frame = frame
+    self.stream = collector.name
+
+  def release(self):
+    if self._collector is not None:
+      self._collector._release(self._slot)
+      self._collector = None
+      self.frame = None
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc):
+    self.release()
+    return False
+
+
+def gst_pipeline(
+  url,
+  size=None,            # (width, height), scaled inside the pipeline
+  decoder="decodebin",  # e.g. "rtph264depay ! h264parse ! vaapih264dec"
+  latency=0,
+):
+  # always 3 channel BGR, the detector, letterbox and motion gate expect it
+  caps = "video/x-raw,format=BGR"
+  if size is not None:
+    caps += f",width={size[0]},height={size[1]}"
+  return (
+    f"rtspsrc location={url} latency={latency} "
+    f"! {decoder} "
+    # scale in the decoder's format first, convert the smaller frame after
+    "! videoscale ! videoconvert "
+    f"! {caps} "
+    "! appsink drop=true max-buffers=1 sync=false"
+  )
 
 
 class FrameCollector:
   def __init__(
     self,
     rtsp_url,
+    ring_size=3,
+    stall_frames=30,
+    backoff=0.5,
+    max_backoff=10.0,
+    timeout_ms=5000,
+    name=None,
+    backend="ffmpeg",     # "ffmpeg" | "gstreamer"
+    ffmpeg_options=None,  # e.g. "rtsp_transport;tcp|fflags;nobuffer"
+    hw_accel=False,       # ffmpeg only, lets opencv pick a hw decoder
+    size=None,            # gstreamer only, (width, height) decoded size
+    gst_decoder="decodebin",
+    decode="all",         # "all" | "on_demand", see request_frame
   ):
+    if backend not in ("ffmpeg", "gstreamer"):
+      raise ValueError(f"unknown capture backend `{backend}`.")
+    if decode not in ("all", "on_demand"):
+      raise ValueError(f"unknown decode mode `{decode}`.")
+    if ring_size < 2:
+      raise ValueError("ring_size must be at least 2.")
     self.rtsp_url = rtsp_url
-    self._frame = None
-    self._frame_ts = None
+    self.name = name
+    self._listeners = []
+    self._backend = backend
+    self._ffmpeg_options = ffmpeg_options
+    self._hw_accel = hw_accel
+    self._size = size
+    self._gst_decoder = gst_decoder
+    self._decode = decode
+    self._wanted = False
+    self.grabbed = 0
+    self.decoded = 0
+    self._ring_size = ring_size
+    self._slots = [None] * ring_size
+    self._slot_ts = [None] * ring_size
+    self._slot_seq = [0] * ring_size
+    self._slot_refs = [0] * ring_size
+    self._latest = -1
+    self._writing = -1
+    self._seq = 0
+    # a stall is no new frame within stall_frames frame periods
+    self._stall_frames = stall_frames
+    self._stall_timeout = stall_frames / DEFAULT_FPS
+    self._backoff = backoff
+    self._max_backoff = max_backoff
+    self._timeout_ms = timeout_ms
+    self._last_io = 0.0
+    self.state = "connecting"
+    self.reconnects = 0
     self._running = True
+    self._stopped = threading.Event()
     self._lock = threading.RLock()
+    self._new_frame = threading.Condition(self._lock)
     self._cap = None
-    self._connect()
-    if not self._cap or not self._cap.isOpened():
-      print("Error: Could not open RTSP stream.")
-      exit()
+    if not self._connect():
+      # a camera that is down at boot is retried like a dropped link, the
+      # other streams of a pool keep running meanwhile
+      print("Could not open RTSP stream, retrying in the background.")
+      self.state = "reconnecting"
     self._thread = threading.Thread(
       target=self._update,
       daemon=True,
@@ -28,78 +166,442 @@ class FrameCollector:
     self._thread.start()
     print("Frame collector started.")
 
-  def _connect(self):
-    print("Trying to connect using FFmpeg backend...")
+  def _open(self):
+    # bounded open / read so a dead link fails instead of hanging, a grab
+    # blocked forever would also keep the stall supervisor from running
+    params = [
+      cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, self._timeout_ms,
+      cv2.CAP_PROP_READ_TIMEOUT_MSEC, self._timeout_ms,
+    ]
+    if self._backend == "gstreamer":
+      # decode, convert and downscale happen inside the media pipeline.
+      # a full pipeline string (ending in appsink) is used as given.
+      pipeline = self.rtsp_url
+      if "appsink" not in pipeline:
+        pipeline = gst_pipeline(
+          self.rtsp_url,
+          self._size,
+          self._gst_decoder,
+        )
+      return cv2.VideoCapture(pipeline, cv2.CAP_GSTREAMER, params)
+    if self._ffmpeg_options is not None:
+      # read by opencv at open time, process wide
+      os.environ["OPENCV_FFMPEG_CAPTURE_OPTIONS"] = self._ffmpeg_options
+    if self._hw_accel:
+      params += [
+        cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY,
+      ]
+    cap = cv2.VideoCapture(
+      self.rtsp_url,
+      cv2.CAP_FFMPEG,
+      params,
+    )
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    return cap
+
+  def _connect(self):   # True once a first frame is published
+    print(f"Trying to connect using {self._backend} backend...")
     try:
-      cap = cv2.VideoCapture(self.rtsp_url, cv2.CAP_FFMPEG)
-      cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+      cap = self._open()
       if cap.isOpened():
         ret, frame = cap.read()
+        if ret and frame is not None and (frame.ndim != 3 or frame.shape[2] != 3):
+          # e.g. a hand written gstreamer pipeline with GRAY8 caps
+          print(f"Capture must deliver 3 channel BGR frames, got shape {frame.shape}.")
+          ret = False
         if ret and frame is not None:
           ts = time.time()
           print("Connection Successful.")
+          fps = cap.get(cv2.CAP_PROP_FPS)
+          if not 0 < fps <= 240:
+            fps = DEFAULT_FPS
+          self._stall_timeout = self._stall_frames / fps
+          self._last_io = ts
           self._cap = cap
           with self._lock:
-            self._frame = frame
-            self._frame_ts = ts
-          return
+            for i in range(self._ring_size):
+              if self._slot_refs[i] == 0 and (
+                self._slots[i] is None or self._slots[i].shape != frame.shape
+              ):
+                self._slots[i] = np.empty_like(frame)
+            idx = self._free_slot()
+            if idx is None:
+              # only swaps the slot's array, leased views keep the old one
+              idx = (self._latest + 1) % self._ring_size
+            self._publish(idx, frame, ts)
+            self.state = "ok"
+          return True
         cap.release()
     except Exception as e:
       print(f"Connection failed: {e}")
+    return False
+
+  def _drop_connection(self):
+    cap, self._cap = self._cap, None
+    if cap is not None:
+      try:
+        cap.release()
+      except Exception as e:
+        print(f"Error releasing capture: {e}")
+
+  def _reconnect(self):
+    delay = self._backoff
+    while self._running:
+      self.state = "reconnecting"
+      if self._connect():
+        self.reconnects += 1
+        print(f"Reconnected (#{self.reconnects}).")
+        return
+      print(f"Reconnect failed, retrying in {delay:.1f}s.")
+      if self._stopped.wait(delay):
+        return
+      delay = min(delay * 2, self._max_backoff)
+
+  def _free_slot(self):
+    # caller holds the lock
+    for step in range(1, self._ring_size + 1):
+      idx = (self._latest + step) % self._ring_size
+      if idx != self._latest and self._slot_refs[idx] == 0:
+        return idx
+    return None
+
+  def _publish(
+    self,
+    idx,
+    frame,
+    ts,
+  ):
+    # caller holds the lock
+    self._slots[idx] = frame
+    self._seq += 1
+    self._slot_seq[idx] = self._seq
+    self._slot_ts[idx] = ts
+    self._latest = idx
+    self._writing = -1
+    self._wanted = False
+    self._new_frame.notify_all()
+    for fn in self._listeners:
+      fn()
+
+  def _step(self):
+    if not self._cap.grab():
+      time.sleep(0.01)
+      return
+    self._last_io = time.time()
+    self.grabbed += 1
+    with self._lock:
+      idx = self._free_slot()
+      if self._decode == "on_demand" and not self._wanted:
+        idx = None
+      self._writing = -1 if idx is None else idx
+    if idx is None:
+      # nobody asked for this frame or every spare slot is leased,
+      # the grab alone keeps the stream drained
+      return
+    # retrieving happens outside the lock, the slot is neither
+    # the latest one nor leased so no reader can observe it
+    ret, frame = self._cap.retrieve(image=self._slots[idx])
+    if ret and frame is not None:
+      self.decoded += 1
+      with self._lock:
+        self._publish(idx, frame, self._last_io)
+        self.state = "ok"
+    else:
+      with self._lock:
+        self._slot_ts[idx] = None
+        self._writing = -1
 
   def _update(self):
+    # supervised capture loop: decode, detect stalls, reconnect
     while self._running:
+      if self._cap is None or not self._cap.isOpened():
+        self._drop_connection()
+        self._reconnect()
+        continue
       try:
-        if self._cap and self._cap.isOpened():
-          ret, frame = self._cap.read()
-          if ret and frame is not None:
-            ts = time.time()
-            with self._lock:
-              self._frame = frame
-              self._frame_ts = ts
-          else:
-            time.sleep(0.01)
-        else:
-          time.sleep(0.1)
+        self._step()
       except Exception as e:
         print(f"Error in frame update thread: {e}")
         time.sleep(0.1)
+      # grabs count as progress, leased slots may hold back publishing
+      idle = time.time() - self._last_io
+      if self._running and idle > self._stall_timeout:
+        print(f"Stream stalled, no frame for {idle:.1f}s.")
+        self.state = "stalled"
+        self._drop_connection()
+    # the capture is released here, on the thread that may be inside grab()
+    self._drop_connection()
 
-  def read(self):   # (timestamp, frame)
+  def add_listener(
+    self,
+    fn,
+  ):
+    # fn() runs on the capture thread under the lock for every new frame,
+    # it must be cheap and must not block (e.g. Event.set)
+    with self._lock:
+      self._listeners.append(fn)
+
+  def frame_age(self):   # seconds since the latest frame, inf before any
+    with self._lock:
+      if self._latest < 0 or self._slot_ts[self._latest] is None:
+        return float("inf")
+      return time.time() - self._slot_ts[self._latest]
+
+  def health(self):
+    # in on_demand mode frame_age is the last retrieved frame, it grows to
+    # about the consumer's interval on a healthy stream; grab_age is the
+    # link's liveness either way
+    return {
+      "state": self.state,
+      "frame_age": self.frame_age(),
+      "grab_age": time.time() - self._last_io if self._last_io else float("inf"),
+      "seq": self.seq,
+      "reconnects": self.reconnects,
+      "grabbed": self.grabbed,
+      "decoded": self.decoded,
+    }
+
+  def request_frame(self):   # False when every frame is decoded anyway
+    # in on_demand mode frames are only grabbed, skipping the colour
+    # conversion and the copy into the ring, until a consumer asks. the
+    # next grab is then retrieved. waiting for a new frame asks implicitly.
+    if self._decode != "on_demand":
+      return False
     with self._lock:
-      if self._frame is not None and self._frame_ts is not None:
-        try:
-          return (
-            copy.deepcopy(self._frame_ts),
-            self._frame.copy(),
-          )
-        except Exception as e:
-          print(f"Error copying frame: {e}")
-          return (None, None)
+      self._wanted = True
+    return True
+
+  def _release(
+    self,
+    idx,
+  ):
+    with self._lock:
+      self._slot_refs[idx] -= 1
+
+  def _lease_slot(
+    self,
+    idx,
+  ):
+    # caller holds the lock
+    self._slot_refs[idx] += 1
+    view = self._slots[idx].view()
+    view.flags.writeable = False
+    return FrameLease(
+      self,
+      idx,
+      self._slot_seq[idx],
+      self._slot_ts[idx],
+      view,
+    )
+
+  @property
+  def seq(self):   # sequence number of the latest frame, 0 before any
+    with self._lock:
+      return self._seq
+
+  def _wait_new(
+    self,
+    after_seq,
+    timeout,
+  ):
+    # caller holds the lock
+    if self._seq <= after_seq:
+      self.request_frame()
+    return self._new_frame.wait_for(
+      lambda: self._seq > after_seq or not self._running,
+      timeout,
+    ) and self._seq > after_seq
+
+  def lease(
+    self,
+    timeout=1.0,   # on_demand only, bound on waiting for the requested frame
+  ):   # FrameLease | None
+    with self._lock:
+      if self._decode == "on_demand":
+        # the ring only holds what was last asked for, fetch a fresh frame
+        if not self._wait_new(self._seq, timeout):
+          return None
+      if self._latest < 0:
+        return None
+      return self._lease_slot(self._latest)
+
+  def wait_for_new_frame(
+    self,
+    after_seq,
+    timeout=None,
+  ):   # FrameLease newer than after_seq | None on timeout
+    with self._lock:
+      if not self._wait_new(after_seq, timeout):
+        return None
+      return self._lease_slot(self._latest)
+
+  def lease_recent(
+    self,
+    n=None,
+    after_seq=0,
+    timeout=0,
+  ):   # [FrameLease], oldest first
+    with self._lock:
+      if timeout != 0 and not self._wait_new(after_seq, timeout):
+        return []
+      slots = [
+        i for i in range(self._ring_size)
+        if i != self._writing
+        and self._slot_ts[i] is not None
+        and self._slot_seq[i] > after_seq
+      ]
+      slots.sort(key=lambda i: self._slot_seq[i])
+      if n is not None:
+        slots = slots[-n:]
+      return [self._lease_slot(i) for i in slots]
+
+  def read(
+    self,
+    timeout=1.0,
+  ):   # (timestamp, frame)
+    lease = self.lease(timeout)
+    if lease is None:
       return (None, None)
+    with lease:
+      try:
+        return (
+          lease.ts,
+          lease.frame.copy(),
+        )
+      except Exception as e:
+        print(f"Error copying frame: {e}")
+        return (None, None)
 
   def stop(self):
-    self._running = False
+    with self._lock:
+      self._running = False
+      self._new_frame.notify_all()
+    self._stopped.set()
+    if self._thread.is_alive():
+      # a grab blocks for at most the read timeout
+      self._thread.join(timeout=self._timeout_ms / 1e3 + 1.0)
     if self._thread.is_alive():
-      self._thread.join(timeout=2.0)
-    if self._cap:
-      self._cap.release()
+      print("Capture thread still busy, it releases the capture on exit.")
+    else:
+      self._drop_connection()
+    self.state = "stopped"
     print("Frame collector stopped.")
 
 
+class Letterbox:
+  # resizes + pads frames into reusable model-sized buffers, one per batch slot.
+  # stride=None pads to a size x size square, which fixed-shape exports need
+  # (onnx, openvino, torchscript). backends that take dynamic shapes (.pt) get
+  # a stride, then only the short side is padded up to a multiple of it, as
+  # ultralytics does with auto=True, e.g. 1280x720 -> 640x384 instead of 640x640
+  def __init__(
+    self,
+    size=640,
+    color=114,
+    stride=None,
+  ):
+    self.size = size
+    self.color = color
+    self.stride = stride
+    self._bufs = []
+    self._resized = []
+    self.meta = []    # per slot: (ratio, left, top, orig_w, orig_h)
+
+  def __call__(
+    self,
+    frame,
+    slot=0,
+  ):   # view into the slot buffer, valid until the slot is reused
+    while len(self._bufs) <= slot:
+      self._bufs.append(None)
+      self._resized.append(None)
+      self.meta.append(None)
+    h, w = frame.shape[:2]
+    r = min(self.size / h, self.size / w)
+    nw, nh = round(w * r), round(h * r)
+    if self.stride is None:
+      bw = bh = self.size
+    else:
+      bw = -(-nw // self.stride) * self.stride
+      bh = -(-nh // self.stride) * self.stride
+    left, top = (bw - nw) // 2, (bh - nh) // 2
+    buf = self._bufs[slot]
+    if buf is None or buf.shape[:2] != (bh, bw):
+      buf = self._bufs[slot] = np.full(
+        (bh, bw, 3),
+        self.color,
+        dtype=np.uint8,
+      )
+    elif self.meta[slot] is None or self.meta[slot][1:] != (left, top, w, h):
+      buf[:] = self.color
+    resized = self._resized[slot]
+    if resized is None or resized.shape[:2] != (nh, nw):
+      resized = np.empty((nh, nw, 3), dtype=np.uint8)
+      self._resized[slot] = resized
+    # opencv reallocates dst on a shape / type mismatch, use what it returns
+    resized = cv2.resize(
+      frame,
+      (nw, nh),
+      dst=resized,
+      interpolation=cv2.INTER_LINEAR,
+    )
+    buf[top:top + nh, left:left + nw] = resized
+    self.meta[slot] = (r, left, top, w, h)
+    return buf
+
+  @staticmethod
+  def unmap(
+    xyxy,     # (N, 4) array in letterbox coords, updated in place
+    meta,
+  ):
+    r, left, top, w, h = meta
+    xs, ys = xyxy[:, 0::2], xyxy[:, 1::2]
+    xs -= left
+    ys -= top
+    xyxy /= r
+    np.clip(xs, 0, w, out=xs)
+    np.clip(ys, 0, h, out=ys)
+    return xyxy
+
+
 class Detector:
   def __init__(
     self,
     model_path,
+    letterbox=False,
+    imgsz=640,
   ):
     self._model_path = model_path
     self._model = None
+    self._imgsz = imgsz
+    # opt-in: letterbox into reusable buffers before handing frames to the
+    # model, boxes from detect*() are mapped back to frame coordinates
+    self._letterbox = Letterbox(imgsz) if letterbox else None
 
   def load(self):
+    # .pt, .onnx, .torchscript or an *_openvino_model/ directory
+    # imported here so that importing adlibpredict does not pull in torch
+    from ultralytics import YOLO
     print(f"Loading model from {self._model_path}...")
-    self._model = YOLO(self._model_path)
+    self._model = YOLO(self._model_path, task="detect")
+    if self._letterbox is not None and str(self._model_path).endswith(".pt"):
+      # pytorch weights take any stride multiple, exports keep the square
+      self._letterbox.stride = int(max(self._model.model.stride))
     print("Model loaded successfully.")
 
+  def warmup(
+    self,
+    runs=1,
+    shape=(720, 1280, 3),
+  ):   # seconds taken by the last run
+    dummy = np.zeros(shape, dtype=np.uint8)
+    dt = 0.0
+    for _ in range(runs):
+      t0 = time.perf_counter()
+      self.predict(dummy)
+      dt = time.perf_counter() - t0
+    return dt
+
   def predict(
     self,
     frame,
@@ -107,18 +609,143 @@ class Detector:
     iou=0.45,
     verbose=False,
   ):
+    # with letterbox enabled, results are in model (imgsz) coordinates
     if self._model is None:
       raise RuntimeError("Model not loaded. Call load() first.")
     if frame is None:
       raise ValueError("Frame is None, cannot predict")
+    if self._letterbox is not None:
+      frame = self._letterbox(frame)
     results = self._model(
       frame,
       conf=conf,
       iou=iou,
+      imgsz=self._imgsz,
       verbose=verbose,
     )
     return results[0]
 
+  def predict_batch(
+    self,
+    frames,
+    conf=0.25,
+    iou=0.45,
+    verbose=False,
+  ):
+    if self._model is None:
+      raise RuntimeError("Model not loaded. Call load() first.")
+    if not frames:
+      return []
+    if any(f is None for f in frames):
+      raise ValueError("Frame is None, cannot predict")
+    frames = list(frames)
+    if self._letterbox is not None:
+      frames = [self._letterbox(f, i) for i, f in enumerate(frames)]
+    return self._model(
+      frames,
+      conf=conf,
+      iou=iou,
+      imgsz=self._imgsz,
+      verbose=verbose,
+    )
+
+  def _meta(
+    self,
+    slot,
+  ):
+    if self._letterbox is None:
+      return None
+    return self._letterbox.meta[slot]
+
+  @staticmethod
+  def _match(
+    res,
+    frame_ts,
+    class_id,
+    min_conf,
+    min_area=None,
+    meta=None,
+  ):   # Detection | None
+    boxes = res.boxes
+    if boxes is None or len(boxes) == 0:
+      return None
+    # rows: x1, y1, x2, y2, conf, cls; fetched in one transfer
+    data = boxes.cpu().numpy().data
+    if meta is not None:
+      data = data.copy()
+      Letterbox.unmap(data[:, :4], meta)
+    pred_cls = data[:, 5].astype(np.int64)
+    pred_conf = data[:, 4]
+    mask = np.isin(pred_cls, _as_classes(class_id, min_conf))
+    if isinstance(min_conf, dict):
+      thresholds = np.full(len(pred_cls), DEFAULT_MIN_CONF)
+      for c, t in min_conf.items():
+        thresholds[pred_cls == c] = t
+      mask &= pred_conf >= thresholds
+    else:
+      mask &= pred_conf >= min_conf
+    if min_area:
+      area = (data[:, 2] - data[:, 0]) * (data[:, 3] - data[:, 1])
+      mask &= area >= min_area
+    if not mask.any():
+      return None
+    candidates = np.flatnonzero(mask)
+    best = candidates[pred_conf[candidates].argmax()]
+    return Detection(
+      frame_ts,
+      int(pred_cls[best]),
+      float(pred_conf[best]),
+      tuple(float(v) for v in data[best, :4]),
+    )
+
+  def detect(
+    self,
+    frame,
+    frame_ts,
+    conf=0.25,
+    iou=0.45,
+    verbose=False,
+    class_id=0,
+    min_conf=DEFAULT_MIN_CONF,
+    min_area=None,
+  ):   # best Detection | None
+    res = self.predict(
+      frame,
+      conf,
+      iou,
+      verbose,
+    )
+    return self._match(
+      res,
+      frame_ts,
+      class_id,
+      min_conf,
+      min_area,
+      self._meta(0),
+    )
+
+  def detect_batch(
+    self,
+    items,    # [(frame_ts, frame)]
+    conf=0.25,
+    iou=0.45,
+    verbose=False,
+    class_id=0,
+    min_conf=DEFAULT_MIN_CONF,
+    min_area=None,
+  ):   # [Detection | None]
+    items = list(items)
+    results = self.predict_batch(
+      [frame for _, frame in items],
+      conf,
+      iou,
+      verbose,
+    )
+    return [
+      self._match(res, frame_ts, class_id, min_conf, min_area, self._meta(i))
+      for i, ((frame_ts, _), res) in enumerate(zip(items, results))
+    ]
+
   def is_detected(
     self,
     frame,
@@ -127,25 +754,41 @@ class Detector:
     iou=0.45,
     verbose=False,
     class_id=0,
-    min_conf=0.3,
+    min_conf=DEFAULT_MIN_CONF,
+    min_area=None,
   ):
     # -1.0      -> False
     # <float>ts -> True
-    res = self.predict(
+    det = self.detect(
       frame,
+      frame_ts,
       conf,
       iou,
       verbose,
+      class_id,
+      min_conf,
+      min_area,
     )
-    boxes = res.boxes
-    if boxes is None or len(boxes) == 0:
-      return -1.0
-    pred_cls = boxes.cls
-    pred_conf = boxes.conf
-    for c, s in zip(pred_cls, pred_conf):
-      if int(c) != class_id:
-        continue
-      if s < min_conf:
-        continue
-      return frame_ts
-    return -1.0
+    return -1.0 if det is None else det.ts
+
+  def is_detected_batch(
+    self,
+    items,    # [(frame_ts, frame)]
+    conf=0.25,
+    iou=0.45,
+    verbose=False,
+    class_id=0,
+    min_conf=DEFAULT_MIN_CONF,
+    min_area=None,
+  ):
+    # one decision per item, same encoding as is_detected()
+    dets = self.detect_batch(
+      items,
+      conf,
+      iou,
+      verbose,
+      class_id,
+      min_conf,
+      min_area,
+    )
+    return [-1.0 if d is None else d.ts for d in dets]
@@ -0,0 +1,347 @@
+import time
+import threading
+from collections import deque
+from rich import print
+from adlibpredict._pool import CollectorPool
+
+
+class LatestQueue:
+  # bounded queue, a put on a full queue evicts the oldest item. with a key
+  # the bound holds per key, so one busy key cannot evict another's items.
+  # with a rank the lowest ranked item goes instead, possibly the new one
+  def __init__(
+    self,
+    maxsize=1,
+    on_drop=None,
+    key=None,
+    rank=None,
+  ):
+    if maxsize < 1:
+      raise ValueError("maxsize must be at least 1.")
+    self._items = deque()
+    self._maxsize = maxsize
+    self._on_drop = on_drop
+    self._key = key
+    self._rank = rank
+    self._cond = threading.Condition()
+    self._closed = False
+    self.dropped = 0
+
+  def put(
+    self,
+    item,
+  ):
+    dropped = None
+    with self._cond:
+      if self._closed:
+        dropped = item
+      else:
+        if self._key is None:
+          same = range(len(self._items))
+        else:
+          k = self._key(item)
+          same = [i for i, x in enumerate(self._items) if self._key(x) == k]
+        if len(same) < self._maxsize:
+          self._items.append(item)
+          self._cond.notify()
+        else:
+          self.dropped += 1
+          victim = same[0]
+          if self._rank is not None:
+            victim = min(same, key=lambda i: self._rank(self._items[i]))
+            if self._rank(item) <= self._rank(self._items[victim]):
+              victim = None
+          if victim is None:
+            dropped = item
+          else:
+            dropped = self._items[victim]
+            del self._items[victim]
+            self._items.append(item)
+            self._cond.notify()
+    if dropped is not None and self._on_drop is not None:
+      self._on_drop(dropped)
+
+  def get(
+    self,
+    timeout=None,
+  ):   # item | None on timeout / close
+    with self._cond:
+      if not self._cond.wait_for(
+        lambda: self._items or self._closed,
+        timeout,
+      ):
+        return None
+      if not self._items:
+        return None
+      return self._items.popleft()
+
+  def close(self):
+    with self._cond:
+      self._closed = True
+      items = list(self._items)
+      self._items.clear()
+      self._cond.notify_all()
+    if self._on_drop is not None:
+      for item in items:
+        self._on_drop(item)
+
+  def __len__(self):
+    with self._cond:
+      return len(self._items)
+
+
+class StageStats:
+  def __init__(
+    self,
+    name,
+  ):
+    self.name = name
+    self.count = 0
+    self.total = 0.0
+    self.last = 0.0
+    self.max = 0.0
+    self._lock = threading.Lock()
+
+  def record(
+    self,
+    dt,
+  ):
+    with self._lock:
+      self.count += 1
+      self.total += dt
+      self.last = dt
+      if dt > self.max:
+        self.max = dt
+
+  def snapshot(self):   # {count, last, mean, max} in seconds
+    with self._lock:
+      return {
+        "count": self.count,
+        "last": self.last,
+        "mean": self.total / self.count if self.count else 0.0,
+        "max": self.max,
+      }
+
+  def __str__(self):
+    s = self.snapshot()
+    return (
+      f"{self.name}: n={s['count']} "
+      f"last={s['last'] * 1e3:.1f}ms "
+      f"mean={s['mean'] * 1e3:.1f}ms "
+      f"max={s['max'] * 1e3:.1f}ms"
+    )
+
+
+def _release_all(leases):
+  for lease in leases:
+    lease.release()
+
+
+class Pipeline:
+  # capture -> inference -> trigger, each stage on its own thread. one
+  # detector serves every stream of the collector (or CollectorPool).
+  def __init__(
+    self,
+    collector,  # FrameCollector | CollectorPool
+    detector,
+    sender,     # sender(Detection), Detection.stream names the source
+    interval,
+    batch_size=1,
+    trigger_queue_size=1,   # pending triggers per stream
+    detect_kwargs=None,
+    gate=None,        # () -> MotionGate, one per stream | None
+    coalescer=None,   # () -> hooks.client.TriggerCoalescer, one per stream | None
+  ):
+    if not isinstance(collector, CollectorPool):
+      collector = CollectorPool({collector.name: collector})
+    self._pool = collector
+    self._detector = detector
+    self._gate = gate
+    self._gates = {}
+    self._coalescer = coalescer
+    self._coalescers = {}
+    self._sender = sender
+    self._interval = interval
+    self._batch_size = batch_size
+    self._detect_kwargs = detect_kwargs or {}
+    self._frames = LatestQueue(1, on_drop=_release_all)
+    # a coalescer sends a burst's most confident detection, so while the
+    # sender is busy keep the best pending one rather than the newest
+    self._triggers = LatestQueue(
+      trigger_queue_size,
+      key=lambda det: det.stream,
+      rank=None if coalescer is None else lambda det: det.conf,
+    )
+    self._running = False
+    self._threads = []
+    self.stats = {
+      "capture": StageStats("capture"),     # frame age at hand-off
+      "inference": StageStats("inference"),
+      "trigger": StageStats("trigger"),
+      "end_to_end": StageStats("end_to_end"),   # frame ts -> trigger sent
+    }
+    self.gated = 0
+
+  def _capture(self):
+    next_tick = time.perf_counter()
+    while self._running:
+      time.sleep(max(0, next_tick - time.perf_counter()))
+      # wakes on frame arrival, never hands out a frame twice
+      leases = self._pool.lease_next(
+        self._batch_size,
+        timeout=0.5,
+      )
+      if not leases:
+        continue
+      next_tick = time.perf_counter() + self._interval
+      self.stats["capture"].record(time.time() - max(l.ts for l in leases))
+      self._frames.put(leases)
+
+  def _apply_gate(
+    self,
+    leases,
+  ):   # [(lease, roi | None)] worth running, the rest are released
+    if self._gate is None:
+      return [(l, None) for l in leases]
+    kept = []
+    for l in leases:
+      gate = self._gates.get(l.stream)
+      if gate is None:
+        gate = self._gates[l.stream] = self._gate()
+      run, roi = gate.check(l.frame, l.ts)
+      if run:
+        kept.append((l, roi))
+      else:
+        self.gated += 1
+        l.release()
+    return kept
+
+  def _infer(self):
+    while self._running:
+      leases = self._frames.get(timeout=0.5)
+      if leases is None:
+        continue
+      t0 = time.perf_counter()
+      kept = self._apply_gate(leases)
+      leases = [l for l, _ in kept]
+      if not kept:
+        continue
+      streams = [l.stream for l in leases]
+      try:
+        items = [
+          (l.ts, l.frame if roi is None else l.frame[roi[1]:roi[3], roi[0]:roi[2]])
+          for l, roi in kept
+        ]
+        if len(items) == 1:
+          results = [self._detector.detect(
+            items[0][1],
+            items[0][0],
+            **self._detect_kwargs,
+          )]
+        else:
+          results = self._detector.detect_batch(
+            items,
+            **self._detect_kwargs,
+          )
+        for res, (_, roi) in zip(results, kept):
+          if res is not None and roi is not None:
+            x1, y1, x2, y2 = res.xyxy
+            res.xyxy = (x1 + roi[0], y1 + roi[1], x2 + roi[0], y2 + roi[1])
+      except Exception as e:
+        print(f"inference failed: {e}")
+        continue
+      finally:
+        _release_all(leases)
+      self.stats["inference"].record(time.perf_counter() - t0)
+      print(f"detection result: {results}")
+      # most confident positive per stream, each is routed on its own
+      best = {}
+      for res, stream in zip(results, streams):
+        if res is not None and (stream not in best or res.conf > best[stream].conf):
+          best[stream] = res
+      for stream, res in best.items():
+        res.stream = stream
+        self._triggers.put(res)
+
+  def _send(
+    self,
+    det,
+  ):
+    t0 = time.perf_counter()
+    try:
+      self._sender(det)
+    except Exception as e:
+      print(f"trigger failed: {e}")
+      return
+    self.stats["trigger"].record(time.perf_counter() - t0)
+    self.stats["end_to_end"].record(time.time() - det.ts)
+    print("trigger sent.")
+
+  def _coalescer_for(
+    self,
+    stream,
+  ):
+    c = self._coalescers.get(stream)
+    if c is None:
+      c = self._coalescers[stream] = self._coalescer()
+    return c
+
+  def _flush_ready(self):
+    for c in list(self._coalescers.values()):
+      ready = c.pop_ready()
+      if ready is not None:
+        self._send(ready)
+
+  def _dispatch(self):
+    while self._running:
+      timeout = 0.5
+      for c in self._coalescers.values():
+        wait = c.wait_time()
+        if wait is not None:
+          timeout = min(timeout, wait)
+      det = self._triggers.get(timeout=timeout)
+      if self._coalescer is None:
+        if det is not None:
+          self._send(det)
+        continue
+      # flush bursts that came due before this detection arrived
+      self._flush_ready()
+      if det is not None:
+        self._coalescer_for(det.stream).offer(det)
+        self._flush_ready()
+
+  def start(self):
+    self._running = True
+    self._threads = [
+      threading.Thread(target=target, name=name, daemon=True)
+      for name, target in (
+        ("capture", self._capture),
+        ("inference", self._infer),
+        ("trigger", self._dispatch),
+      )
+    ]
+    for t in self._threads:
+      t.start()
+    print("Pipeline started.")
+
+  def stop(self):
+    self._running = False
+    self._frames.close()
+    self._triggers.close()
+    for t in self._threads:
+      t.join(timeout=2.0)
+    print("Pipeline stopped.")
+
+  def report(self):
+    for s in self.stats.values():
+      print(str(s))
+    print(
+      f"dropped: frames={self._frames.dropped} "
+      f"triggers={self._triggers.dropped} "
+      f"gated={self.gated}"
+    )
+    for stream, c in self._coalescers.items():
+      print(
+        f"{stream}: coalesced={c.coalesced} "
+        f"suppressed={c.suppressed}"
+      )
@@ -0,0 +1,99 @@
+import time
+import threading
+
+
+class CollectorPool:
+  # several FrameCollectors behind one consumer cursor, frames are handed
+  # out round-robin so one busy stream cannot starve the others
+  def __init__(
+    self,
+    collectors,   # {name: FrameCollector}
+  ):
+    if not collectors:
+      raise ValueError("collectors must not be empty.")
+    self._collectors = dict(collectors)
+    self._names = list(self._collectors)
+    self._cursor = {name: 0 for name in self._names}
+    self._next = 0
+    self._arrived = threading.Event()
+    for col in self._collectors.values():
+      col.add_listener(self._arrived.set)
+
+  @property
+  def names(self):
+    return list(self._names)
+
+  def __len__(self):
+    return len(self._names)
+
+  def __getitem__(
+    self,
+    name,
+  ):
+    return self._collectors[name]
+
+  def _collect(
+    self,
+    n,
+  ):
+    k = len(self._names)
+    start = self._next
+    self._next = (self._next + 1) % k
+    per = None if n is None else max(1, n // k)
+    leases = []
+    for i in range(k):
+      name = self._names[(start + i) % k]
+      want = per if n is None else min(per, n - len(leases))
+      if want is not None and want <= 0:
+        break
+      got = self._collectors[name].lease_recent(
+        want,
+        after_seq=self._cursor[name],
+      )
+      if got:
+        self._cursor[name] = got[-1].seq
+        leases.extend(got)
+    return leases
+
+  def lease_next(
+    self,
+    n=None,
+    timeout=0,
+  ):   # [FrameLease] unseen by this pool, at most n, waits up to timeout
+    deadline = None if timeout is None else time.monotonic() + timeout
+    # on_demand collectors only decode when asked. ask all of them now and
+    # wait until each has delivered, otherwise a slower stream's frame would
+    # sit in its ring until the next call and go stale.
+    asked = {
+      name: col.seq
+      for name, col in self._collectors.items()
+      if col.request_frame()
+    }
+    leases = []
+    while True:
+      # cleared before collecting, so a frame landing meanwhile re-arms it
+      self._arrived.clear()
+      want = None if n is None else n - len(leases)
+      if want is None or want > 0:
+        leases.extend(self._collect(want))
+      pending = any(
+        self._collectors[name].seq <= seq
+        for name, seq in asked.items()
+      )
+      full = n is not None and len(leases) >= n
+      if (leases and (full or not pending)) or timeout == 0:
+        return leases
+      remaining = None if deadline is None else deadline - time.monotonic()
+      if remaining is not None and remaining <= 0:
+        return leases
+      self._arrived.wait(remaining)
+
+  def health(self):
+    return {
+      name: col.health()
+      for name, col in self._collectors.items()
+    }
+
+  def stop(self):
+    for col in self._collectors.values():
+      col.stop()
@@ -1,10 +1,15 @@
-from hooks import (
-    server,
-    client,
-  )
+import importlib
 
 
 __all__ = [
   "server",
   "client",
 ]
+
+
+def __getattr__(name):
+  # subpackages load on first use, so the detection client does not pay
+  # for the server's fastapi / pydantic / pymavlink imports
+  if name in __all__:
+    return importlib.import_module(f"hooks.{name}")
+  raise AttributeError(f"module `hooks` has no attribute `{name}`")
@@ -1,8 +1,16 @@
 from hooks.client.handler import (
+    TriggerCoalescer,
+    TriggerSender,
     send_trigger,
+    send_trigger_async,
+    send_triggers,
   )
 
 
 __all__ = [
+  "TriggerCoalescer",
+  "TriggerSender",
   "send_trigger",
+  "send_trigger_async",
+  "send_triggers",
 ]
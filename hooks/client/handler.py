@@ -1,23 +1,246 @@
 import time
+import threading
 import requests
 
+from collections import deque
 from rich import print
 
 
 IP = "192.168.0.101"
 PORT = "8000"
 URL = f"http://{IP if not IP else "localhost"}:{PORT}/trigger"
+BATCH_URL = f"{URL}s"
+TIMEOUT = (1.0, 2.0)    # (connect, read) seconds
+# same dedup window as hooks/server/handler.py, keep them in sync
+IGNORE_THRESHOLD = 2.0
 
+_SESSION = None
+_SESSION_LOCK = threading.Lock()
 
-def send_trigger(
-  ts, # time.time()
+
+def _session():
+  # one keep-alive session per process, tcp setup is paid once
+  global _SESSION
+  with _SESSION_LOCK:
+    if _SESSION is None:
+      _SESSION = requests.Session()
+  return _SESSION
+
+
+def _payload(
+  ts,
+  conf=None,
+  bbox=None,
 ):
   payload = {
     "timestamp": ts,
   }
-  r = requests.post(
-    URL,
+  if conf is not None:
+    payload["confidence"] = conf
+  if bbox is not None:
+    payload["bbox"] = list(bbox)
+  return payload
+
+
+def send_trigger(
+  ts, # time.time()
+  timeout=TIMEOUT,
+  conf=None,
+  bbox=None,
+  url=URL,
+):
+  payload = _payload(ts, conf, bbox)
+  payload["sent_at"] = time.time()
+  r = _session().post(
+    url,
     json=payload,
+    timeout=timeout,
+  )
+  r.raise_for_status()
+  print(r.json())
+  return r.status_code
+
+
+def send_triggers(
+  payloads,   # [_payload(...)], one round trip for all of them
+  timeout=TIMEOUT,
+  url=URL,    # the server's /trigger url, batches go to its /triggers
+):
+  sent_at = time.time()
+  r = _session().post(
+    f"{url}s",
+    json={"detections": [{**p, "sent_at": sent_at} for p in payloads]},
+    timeout=timeout,
   )
+  r.raise_for_status()
   print(r.json())
   return r.status_code
+
+
+class TriggerCoalescer:
+  # debounces detections (anything with .ts and .conf) before network io.
+  # the first detection opens a burst that stays open for `hold` seconds,
+  # the highest-confidence detection of the burst is the one sent; anything
+  # closer than `window` seconds to the last sent ts is dropped, as the
+  # server would drop it anyway.
+  def __init__(
+    self,
+    window=IGNORE_THRESHOLD,
+    hold=0.3,
+  ):
+    self.window = window
+    self.hold = hold
+    self._best = None
+    self._deadline = None
+    self._last_sent = None
+    self.suppressed = 0
+    self.coalesced = 0
+
+  def offer(
+    self,
+    det,
+    now=None,
+  ):   # False when suppressed
+    now = time.time() if now is None else now
+    if self._last_sent is not None and det.ts - self._last_sent < self.window:
+      self.suppressed += 1
+      return False
+    if self._best is None:
+      self._best = det
+      self._deadline = now + self.hold
+      return True
+    self.coalesced += 1
+    if det.conf > self._best.conf:
+      self._best = det
+    return True
+
+  def wait_time(
+    self,
+    now=None,
+  ):   # seconds until the open burst is due, None without one
+    if self._best is None:
+      return None
+    now = time.time() if now is None else now
+    return max(0.0, self._deadline - now)
+
+  def pop_ready(
+    self,
+    now=None,
+  ):   # the burst's best detection once it is due, else None
+    if self._best is None or self.wait_time(now) > 0:
+      return None
+    det = self._best
+    self._best = None
+    self._deadline = None
+    self._last_sent = det.ts
+    return det
+
+
+class TriggerSender:
+  # background sender with a bounded outbox; a full outbox drops the oldest
+  # trigger, failed sends are retried with exponential backoff
+  def __init__(
+    self,
+    url=URL,
+    maxlen=64,
+    timeout=TIMEOUT,
+    backoff=0.2,
+    max_backoff=5.0,
+    max_retries=None,   # None retries until sent
+  ):
+    self.url = url
+    self._outbox = deque(maxlen=maxlen)
+    self._cond = threading.Condition()
+    self._timeout = timeout
+    self._backoff = backoff
+    self._max_backoff = max_backoff
+    self._max_retries = max_retries
+    self._running = True
+    self.dropped = 0
+    self._thread = threading.Thread(
+      target=self._run,
+      daemon=True,
+    )
+    self._thread.start()
+
+  def submit(
+    self,
+    ts,
+    conf=None,
+    bbox=None,
+  ):   # never blocks on the network
+    with self._cond:
+      if len(self._outbox) == self._outbox.maxlen:
+        self.dropped += 1
+      self._outbox.append(_payload(ts, conf, bbox))
+      self._cond.notify()
+
+  def pending(self):
+    with self._cond:
+      return len(self._outbox)
+
+  def _run(self):
+    delay = self._backoff
+    retries = 0
+    while True:
+      with self._cond:
+        self._cond.wait_for(lambda: self._outbox or not self._running)
+        if not self._outbox:
+          return
+        # a backlog (e.g. after a link outage) goes out in one request
+        batch = list(self._outbox)
+      try:
+        if len(batch) == 1:
+          send_trigger(
+            batch[0]["timestamp"],
+            self._timeout,
+            batch[0].get("confidence"),
+            batch[0].get("bbox"),
+            self.url,
+          )
+        else:
+          send_triggers(batch, self._timeout, self.url)
+      except Exception as e:
+        if not self._running:
+          print(f"sender stopped, {self.pending()} trigger(s) not sent: {e}")
+          return
+        retries += 1
+        if self._max_retries is None or retries <= self._max_retries:
+          print(f"trigger send failed, retrying in {delay:.1f}s: {e}")
+          with self._cond:
+            self._cond.wait_for(lambda: not self._running, delay)
+          delay = min(delay * 2, self._max_backoff)
+          continue
+        print(f"trigger dropped after {retries} attempts: {e}")
+      with self._cond:
+        # entries may have been evicted by a full outbox while sending
+        for payload in batch:
+          if self._outbox and self._outbox[0] is payload:
+            self._outbox.popleft()
+      delay = self._backoff
+      retries = 0
+
+  def stop(
+    self,
+    timeout=2.0,
+  ):
+    with self._cond:
+      self._running = False
+      self._cond.notify_all()
+    self._thread.join(timeout=timeout)
+
+
+_SENDERS = {}   # url -> TriggerSender
+
+
+def send_trigger_async(
+  ts, # time.time()
+  conf=None,
+  bbox=None,
+  url=URL,
+):
+  with _SESSION_LOCK:
+    sender = _SENDERS.get(url)
+    if sender is None:
+      sender = _SENDERS[url] = TriggerSender(url)
+  sender.submit(ts, conf, bbox)
@@ -8,10 +8,12 @@ sys.path.extend([
 ])
 
 from hooks.server.handler import (
+    TriggerBatchRequest,
     TriggerRequest,
   )
 
 
 __all__ = [
+  "TriggerBatchRequest",
   "TriggerRequest",
 ]
@@ -0,0 +1,134 @@
+import bisect
+import threading
+
+
+# seconds, tuned for hops between a few ms and tens of seconds
+LATENCY_BUCKETS = (
+  0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+  1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+
+def _labels(
+  names,
+  values,
+):
+  if not names:
+    return ""
+  pairs = ",".join(f'{n}="{v}"' for n, v in zip(names, values))
+  return f"{{{pairs}}}"
+
+
+class Counter:
+  def __init__(
+    self,
+    name,
+    doc,
+    labels=(),
+  ):
+    self.name = name
+    self.doc = doc
+    self.labels = tuple(labels)
+    self._values = {}
+    self._lock = threading.Lock()
+
+  def inc(
+    self,
+    *label_values,
+    by=1,
+  ):
+    with self._lock:
+      self._values[label_values] = self._values.get(label_values, 0) + by
+
+  def render(self):
+    lines = [
+      f"# HELP {self.name} {self.doc}",
+      f"# TYPE {self.name} counter",
+    ]
+    with self._lock:
+      for values, v in sorted(self._values.items()):
+        lines.append(f"{self.name}{_labels(self.labels, values)} {v}")
+    return lines
+
+
+class Gauge:
+  # value read from `func` at render time, `kind` may also be "counter"
+  # for totals that are already counted elsewhere
+  def __init__(
+    self,
+    name,
+    doc,
+    func,
+    kind="gauge",
+  ):
+    self.name = name
+    self.doc = doc
+    self.kind = kind
+    self._func = func
+
+  def render(self):
+    return [
+      f"# HELP {self.name} {self.doc}",
+      f"# TYPE {self.name} {self.kind}",
+      f"{self.name} {self._func()}",
+    ]
+
+
+class Histogram:
+  def __init__(
+    self,
+    name,
+    doc,
+    labels=(),
+    buckets=LATENCY_BUCKETS,
+  ):
+    self.name = name
+    self.doc = doc
+    self.labels = tuple(labels)
+    self.buckets = tuple(buckets)
+    self._series = {}   # label values -> [bucket counts..., sum, count]
+    self._lock = threading.Lock()
+
+  def observe(
+    self,
+    value,
+    *label_values,
+  ):
+    i = bisect.bisect_left(self.buckets, value)
+    with self._lock:
+      series = self._series.get(label_values)
+      if series is None:
+        series = [0] * (len(self.buckets) + 2)
+        self._series[label_values] = series
+      if i < len(self.buckets):
+        series[i] += 1
+      series[-2] += value
+      series[-1] += 1
+
+  def render(self):
+    lines = [
+      f"# HELP {self.name} {self.doc}",
+      f"# TYPE {self.name} histogram",
+    ]
+    with self._lock:
+      for values, series in sorted(self._series.items()):
+        cumulative = 0
+        for le, n in zip(self.buckets, series):
+          cumulative += n
+          labels = _labels(self.labels + ("le",), values + (le,))
+          lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _labels(self.labels + ("le",), values + ("+Inf",))
+        lines.append(f"{self.name}_bucket{labels} {series[-1]}")
+        labels = _labels(self.labels, values)
+        lines.append(f"{self.name}_sum{labels} {series[-2]}")
+        lines.append(f"{self.name}_count{labels} {series[-1]}")
+    return lines
+
+
+def render(
+  metrics,
+):   # prometheus text exposition format
+  lines = []
+  for m in metrics:
+    lines.extend(m.render())
+  return "\n".join(lines) + "\n"
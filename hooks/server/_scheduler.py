@@ -0,0 +1,81 @@
+import time
+import heapq
+import asyncio
+import itertools
+
+
+class ScheduledAction:
+  def __init__(
+    self,
+    ts,
+    confidence=None,
+    bbox=None,
+    sent_at=None,
+    received_at=None,
+  ):
+    self.ts = ts
+    self.confidence = confidence
+    self.bbox = bbox
+    self.sent_at = sent_at          # client clock
+    self.received_at = received_at  # server clock
+
+  @property
+  def priority(self):   # higher runs first
+    return 0.0 if self.confidence is None else self.confidence
+
+  def __repr__(self):
+    return f"ScheduledAction(ts={self.ts}, confidence={self.confidence})"
+
+
+class ActionScheduler:
+  # asyncio priority queue for actions: the highest priority item is served
+  # first (older first on ties), items older than `ttl` seconds are expired
+  # instead of being executed with a stale position
+  def __init__(
+    self,
+    ttl=30.0,
+  ):
+    self.ttl = ttl
+    self._heap = []
+    self._counter = itertools.count()
+    self._cond = asyncio.Condition()
+    self.expired = 0
+
+  def empty(self):
+    return not self._heap
+
+  def qsize(self):
+    return len(self._heap)
+
+  def put_nowait(
+    self,
+    item,
+  ):
+    heapq.heappush(
+      self._heap,
+      (-item.priority, item.ts, next(self._counter), item),
+    )
+    # wake a waiting get() without blocking the caller
+    asyncio.get_running_loop().create_task(self._notify())
+
+  async def _notify(self):
+    async with self._cond:
+      self._cond.notify()
+
+  def _expire(
+    self,
+    now,
+  ):
+    live = [e for e in self._heap if now - e[3].ts <= self.ttl]
+    if len(live) != len(self._heap):
+      self.expired += len(self._heap) - len(live)
+      heapq.heapify(live)
+      self._heap = live
+
+  async def get(self):   # ScheduledAction
+    async with self._cond:
+      while True:
+        self._expire(time.time())
+        if self._heap:
+          return heapq.heappop(self._heap)[3]
+        await self._cond.wait()
@@ -1,7 +1,7 @@
 import os
 import sys
 import time
-import threading
+import asyncio
 
 sys.path.extend([
   os.path.abspath(os.path.join(os.path.dirname(__file__), ".")),
@@ -9,80 +9,204 @@ sys.path.extend([
   os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")),
 ])
 
-from collections import deque
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
-from hooks.server.mavproxy import do_action
+from hooks.server.mavproxy import (
+    do_action,
+    start_telemetry,
+  )
+from hooks.server._scheduler import (
+    ActionScheduler,
+    ScheduledAction,
+  )
+from hooks.server._metrics import (
+    Counter,
+    Gauge,
+    Histogram,
+    render,
+  )
 
 
 app = FastAPI()
-queue = deque()
-queue_lock = threading.RLock()
+# created on startup so that it binds to the server's event loop, all
+# access happens on that loop so no lock is needed
+queue = None
+last_ts = None
+_worker_task = None
 
 INITIAL_EXTRA_DELAY = 3.0
 IGNORE_THRESHOLD = 2.0
+ITEM_TTL = 30.0
 
+# hops: detect -> send -> receive (client clock vs server clock, so these
+# include clock skew) -> dequeue -> position lookup -> goto
+HOPS = Histogram(
+  "adlib_trigger_hop_seconds",
+  "Latency of each hop between detection and goto.",
+  labels=("hop",),
+)
+TRIGGERS = Counter(
+  "adlib_triggers_total",
+  "Triggers received, by enqueue status.",
+  labels=("status",),
+)
+ACTIONS = Counter(
+  "adlib_actions_total",
+  "Actions run by the worker, by result.",
+  labels=("result",),
+)
+METRICS = [
+  HOPS,
+  TRIGGERS,
+  ACTIONS,
+  Gauge(
+    "adlib_queue_size",
+    "Actions waiting in the scheduler.",
+    lambda: 0 if queue is None else queue.qsize(),
+  ),
+  Gauge(
+    "adlib_actions_expired_total",
+    "Actions dropped for being older than the ttl.",
+    lambda: 0 if queue is None else queue.expired,
+    kind="counter",
+  ),
+]
 
-def _queue_worker(func):
+
+def _observe(
+  item,
+  dequeued_at,
+  ll_done,
+  goto_done,
+):
+  points = [
+    ("detect_to_send", item.ts, item.sent_at),
+    ("send_to_receive", item.sent_at, item.received_at),
+    ("receive_to_dequeue", item.received_at, dequeued_at),
+    ("dequeue_to_ll", dequeued_at, ll_done),
+    ("ll_to_goto", ll_done, goto_done),
+    ("detect_to_goto", item.ts, goto_done),
+  ]
+  for hop, start, end in points:
+    if start is not None and end is not None:
+      HOPS.observe(max(0.0, end - start), hop)
+
+
+async def _queue_worker(func):
+  loop = asyncio.get_running_loop()
   first = True
   while True:
-    with queue_lock:
-      if not queue:
-        item = None
-        first = True
-      else:
-        item = queue.popleft()
-    if item is None:
-      time.sleep(0.1)
-      continue
+    if queue.empty():
+      first = True
+    item = await queue.get()
     if first:
-      time.sleep(INITIAL_EXTRA_DELAY)
       first = False
-    print(f"An Item Popped. Queue: {queue}")
+      # the extra delay counts from detection time, an item that is
+      # already old enough is not held back. while waiting a better item
+      # may arrive, so the item goes back and the pick is redone.
+      wait = item.ts + INITIAL_EXTRA_DELAY - time.time()
+      if wait > 0:
+        queue.put_nowait(item)
+        await asyncio.sleep(wait)
+        continue
+    dequeued_at = time.time()
     try:
-      func(item)
+      # do_action blocks on file / mavlink io, keep it off the event loop
+      ll_done, goto_done = await loop.run_in_executor(None, func, item.ts)
     except Exception as e:
+      ACTIONS.inc("failed")
       print(f"worker failed: {e}")
+      continue
+    ACTIONS.inc("done")
+    _observe(item, dequeued_at, ll_done, goto_done)
 
 
 class TriggerRequest(BaseModel):
     timestamp: float
+    confidence: float | None = None
+    bbox: list[float] | None = None   # x1, y1, x2, y2 in frame pixels
+    sent_at: float | None = None      # client time.time() at send
 
 
-@app.post("/trigger")
-def trigger(
-  req: TriggerRequest,
+class TriggerBatchRequest(BaseModel):
+    detections: list[TriggerRequest]
+
+
+def _enqueue(
+  req,
 ):
+  global last_ts
   ts = req.timestamp
-  with queue_lock:
-    if not queue:
-      queue.append(ts)
-      print(f"An Item Appended. Queue: {queue}")
-      return {
-        "status": "added",
-        "reason": "queue was empty",
-      }
-    last_ts = queue[-1]
-    interval = ts - last_ts
-    if interval < IGNORE_THRESHOLD:
-      print(f"An Item Ignored. Queue: {queue}")
-      return {
-        "status": "ignored",
-        "reason": f"interval too small ({interval:.2f}s)",
-      }
-    queue.append(ts)
-    print(f"An Item Appended. Queue: {queue}")
+  item = ScheduledAction(
+    ts,
+    req.confidence,
+    req.bbox,
+    req.sent_at,
+    time.time(),
+  )
+  if queue.empty():
+    queue.put_nowait(item)
+    last_ts = ts
+    TRIGGERS.inc("added")
     return {
       "status": "added",
-      "reason": "interval ok",
+      "reason": "queue was empty",
+    }
+  interval = ts - last_ts
+  if interval < IGNORE_THRESHOLD:
+    TRIGGERS.inc("ignored")
+    return {
+      "status": "ignored",
+      "reason": f"interval too small ({interval:.2f}s)",
     }
+  queue.put_nowait(item)
+  last_ts = ts
+  TRIGGERS.inc("added")
+  return {
+    "status": "added",
+    "reason": "interval ok",
+  }
+
+
+@app.post("/trigger")
+async def trigger(
+  req: TriggerRequest,
+):
+  return _enqueue(req)
+
+
+@app.post("/triggers")
+async def triggers(
+  req: TriggerBatchRequest,
+):
+  # no await below, so the whole batch is deduplicated in one step on the
+  # event loop and no other trigger can interleave. items are applied in
+  # timestamp order, results come back in request order.
+  order = sorted(
+    range(len(req.detections)),
+    key=lambda i: req.detections[i].timestamp,
+  )
+  results = [None] * len(order)
+  for i in order:
+    results[i] = _enqueue(req.detections[i])
+  return {
+    "results": results,
+  }
+
+
+@app.get("/metrics")
+async def metrics():
+  return PlainTextResponse(
+    render(METRICS),
+    media_type="text/plain; version=0.0.4",
+  )
 
 
 @app.on_event("startup")
-def start_worker():
-  print("worker thread started.")
-  threading.Thread(
-    target=_queue_worker,
-    args=(do_action,),
-    daemon=True,
-  ).start()
+async def start_worker():
+  global queue, _worker_task
+  queue = ActionScheduler(ITEM_TTL)
+  start_telemetry()
+  _worker_task = asyncio.create_task(_queue_worker(do_action))
+  print("worker task started.")
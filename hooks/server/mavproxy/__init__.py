@@ -8,9 +8,13 @@ sys.path.extend([
   os.path.abspath(os.path.join(os.path.dirname(__file__), "../../..")),
 ])
 
-from hooks.server.mavproxy._action import do_action
+from hooks.server.mavproxy._action import (
+    do_action,
+    start_telemetry,
+  )
 
 
 __all__ = [
   "do_action",
+  "start_telemetry",
 ]
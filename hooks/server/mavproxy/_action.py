@@ -1,7 +1,7 @@
 import os
 import sys
 import time
-import pandas as pd
+import threading
 
 sys.path.extend([
   os.path.abspath(os.path.join(os.path.dirname(__file__), ".")),
@@ -12,20 +12,44 @@ sys.path.extend([
 
 from pymavlink import mavutil
 from hooks.server.mavproxy._const import (
+    CONNECT_BACKOFF,
     LL_STREAM_FILE,
     MAVGEN_CONN_STR,
+    MAX_CONNECT_BACKOFF,
+    MAX_TELEMETRY_GAP,
+    POSITION_STREAM_HZ,
+    TELEMETRY_CAPACITY,
+    TELEMETRY_SOURCE,
+    TELEMETRY_WINDOW,
+  )
+from hooks.server.mavproxy._telemetry import (
+    PositionBuffer,
+    open_index,
   )
 
 
 _SLAVE = None
+_SLAVE_LOCK = threading.Lock()
+if TELEMETRY_SOURCE == "mavlink":
+  _TELEMETRY = PositionBuffer(
+    capacity=TELEMETRY_CAPACITY,
+    window=TELEMETRY_WINDOW,
+  )
+else:
+  _TELEMETRY = open_index(
+    LL_STREAM_FILE,
+    capacity=TELEMETRY_CAPACITY,
+    window=TELEMETRY_WINDOW,
+  )
 
 
 def _get_ll(ts):
-  data = pd.read_csv(LL_STREAM_FILE)
-  idx = (data["Timestamp"] - ts).abs().idxmin()
+  lat, long, _, gap = _TELEMETRY.interpolate(ts)
+  if gap > MAX_TELEMETRY_GAP:
+    print(f"[telemetry] position for {ts:.3f} is {gap:.2f}s away from any sample.")
   return (
-    data.at[idx, "Latitude"],
-    data.at[idx, "Longitude"],
+    lat,
+    long,
   )
 
 
@@ -33,21 +57,84 @@ def _get_mavlink(
   conn_str,
 ):
   global _SLAVE
-  if _SLAVE is None:
-    _SLAVE = mavutil.mavlink_connection(MAVGEN_CONN_STR)
-    _SLAVE.wait_heartbeat()
-    print(
-      "[mavlink] connection established successfull."
-      f"(sysid={_SLAVE.target_system}, compid={_SLAVE.target_component})"
-    )
-  else:
-    print(
-      "[mavlink] using the existing connection."
-      f"(sysid={_SLAVE.target_system}, compid={_SLAVE.target_component})"
-    )
+  with _SLAVE_LOCK:
+    if _SLAVE is None:
+      _SLAVE = mavutil.mavlink_connection(conn_str)
+      _SLAVE.wait_heartbeat()
+      print(
+        "[mavlink] connection established successfull."
+        f"(sysid={_SLAVE.target_system}, compid={_SLAVE.target_component})"
+      )
+    else:
+      print(
+        "[mavlink] using the existing connection."
+        f"(sysid={_SLAVE.target_system}, compid={_SLAVE.target_component})"
+      )
   return _SLAVE
 
 
+def _read_positions(
+  buffer,
+  conn_str,
+):
+  delay = CONNECT_BACKOFF
+  while True:
+    try:
+      mav = _get_mavlink(conn_str)
+      mav.mav.request_data_stream_send(
+        mav.target_system,
+        mav.target_component,
+        mavutil.mavlink.MAV_DATA_STREAM_POSITION,
+        POSITION_STREAM_HZ,
+        1,
+      )
+      break
+    except Exception as e:
+      # port in use, bad connection string, ... keep trying, an empty
+      # buffer makes every do_action fail
+      print(f"[mavlink] position reader could not connect: {e}, retrying in {delay:.1f}s.")
+      time.sleep(delay)
+      delay = min(delay * 2, MAX_CONNECT_BACKOFF)
+  while True:
+    try:
+      msg = mav.recv_match(
+        type="GLOBAL_POSITION_INT",
+        blocking=True,
+        timeout=1.0,
+      )
+    except Exception as e:
+      print(f"[mavlink] position reader failed: {e}")
+      time.sleep(0.1)
+      continue
+    if msg is None:
+      continue
+    # stamped on receipt, same clock as the client's time.time() detections
+    buffer.add(
+      time.time(),
+      msg.lat / 1e7,
+      msg.lon / 1e7,
+      msg.relative_alt / 1e3,
+    )
+
+
+def start_telemetry(
+  conn_str=MAVGEN_CONN_STR,
+  buffer=None,
+):   # background GLOBAL_POSITION_INT reader, a no-op unless TELEMETRY_SOURCE = "mavlink"
+  if buffer is None:
+    if TELEMETRY_SOURCE != "mavlink":
+      return None
+    buffer = _TELEMETRY
+  thread = threading.Thread(
+    target=_read_positions,
+    args=(buffer, conn_str),
+    daemon=True,
+  )
+  thread.start()
+  print("[mavlink] position reader started.")
+  return thread
+
+
 def _goto(
   lat,
   long,
@@ -59,9 +146,14 @@ def _goto(
 
 def do_action(
   timestamp,
-):
+):   # (position lookup done, goto done) as time.time()
   lat, long = _get_ll(timestamp)
+  ll_done = time.time()
   _goto(
     lat,
     long,
   )
+  return (
+    ll_done,
+    time.time(),
+  )
@@ -10,4 +10,17 @@ from platformdirs import user_cache_dir
 #   ensure_exists=True,
 # )) / "tll.csv"
 LL_STREAM_FILE = Path(r"C:\Users\Dell\AppData\Local\nidar\tll.csv")
+# point at tll.bin when mp/script.py runs with LOG_FORMAT = "bin"
+# LL_STREAM_FILE = Path(r"C:\Users\Dell\AppData\Local\nidar\tll.bin")
 MAVGEN_CONN_STR = "udpin:localhost:14551"
+# "file" -> tail LL_STREAM_FILE written by mp/script.py
+# "mavlink" -> read GLOBAL_POSITION_INT on the MAVGEN_CONN_STR connection
+TELEMETRY_SOURCE = "file"
+POSITION_STREAM_HZ = 10
+# telemetry kept in memory for lookups, and the gap that is worth a warning
+TELEMETRY_WINDOW = 600.0
+TELEMETRY_CAPACITY = 8192
+MAX_TELEMETRY_GAP = 1.0
+# retry delays for the position reader's mavlink connection, doubling
+CONNECT_BACKOFF = 0.5
+MAX_CONNECT_BACKOFF = 10.0
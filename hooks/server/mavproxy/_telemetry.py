@@ -0,0 +1,257 @@
+import io
+import os
+import threading
+import numpy as np
+
+
+COLUMNS = ("Timestamp", "Latitude", "Longitude", "Altitude")
+# one record of the binary log, matches mp/script.py RECORD
+RECORD_DTYPE = np.dtype(("<f8", (len(COLUMNS),)))
+
+
+class PositionBuffer:
+  # timestamp-sorted, array-backed columns of fixed capacity; rows older
+  # than `window` seconds are evicted on every append, compaction only
+  # makes room so memory stays flat
+  def __init__(
+    self,
+    capacity=8192,
+    window=600.0,
+  ):
+    self.window = window
+    self._data = np.empty((capacity, len(COLUMNS)), dtype=np.float64)
+    self._start = 0
+    self._size = 0    # end of the live rows, live rows are [_start, _size)
+    self._lock = threading.Lock()
+
+  def __len__(self):
+    return self._size - self._start
+
+  def __repr__(self):
+    return "position buffer"
+
+  def _reset(self):
+    self._start = 0
+    self._size = 0
+
+  def _compact(
+    self,
+    incoming,
+  ):
+    # drop as many of the oldest rows as needed to fit, and move the
+    # survivors to the front
+    cap = len(self._data)
+    live = self._data[self._start:self._size]
+    live = live[max(0, len(live) + incoming - cap):]
+    n = len(live)
+    self._data[:n] = live
+    self._start = 0
+    self._size = n
+
+  def _append(
+    self,
+    rows,
+  ):
+    cap = len(self._data)
+    if len(rows) >= cap:
+      rows = rows[-cap:]
+      self._start = self._size = 0
+    n = len(rows)
+    if self._size + n > cap:
+      self._compact(n)
+    self._data[self._size:self._size + n] = rows
+    ts = self._data[max(self._start, self._size - 1):self._size + n, 0]
+    self._size += n
+    if np.any(np.diff(ts) < 0):
+      # out of order write (clock step), restore the sort invariant
+      view = self._data[self._start:self._size]
+      view[:] = view[np.argsort(view[:, 0], kind="stable")]
+    # rows older than the window are never used for lookups
+    live_ts = self._data[self._start:self._size, 0]
+    self._start += int(np.searchsorted(live_ts, live_ts[-1] - self.window))
+
+  def add(
+    self,
+    ts,
+    lat,
+    long,
+    alt,
+  ):
+    with self._lock:
+      self._append(np.array([[ts, lat, long, alt]], dtype=np.float64))
+
+  def refresh(self):   # number of rows added by the source
+    return 0
+
+  def _live(self):
+    # caller holds the lock
+    self.refresh()
+    if self._size == self._start:
+      raise LookupError(f"no telemetry in {self!r}.")
+    return self._data[self._start:self._size]
+
+  def nearest(
+    self,
+    ts,
+  ):   # (Timestamp, Latitude, Longitude, Altitude) row closest to ts
+    with self._lock:
+      return _nearest(self._live(), ts)
+
+  def interpolate(
+    self,
+    ts,
+  ):   # (Latitude, Longitude, Altitude, gap seconds to the farthest sample used)
+    with self._lock:
+      return _interpolate(self._live(), ts)
+
+
+class TelemetryIndex(PositionBuffer):
+  # tails the telemetry csv, only bytes past the last offset are parsed
+  def __init__(
+    self,
+    path,
+    capacity=8192,
+    window=600.0,
+  ):
+    super().__init__(capacity, window)
+    self.path = path
+    self._offset = 0
+    self._tail = b""
+
+  def __repr__(self):
+    return f"`{self.path}`"
+
+  def _reset(self):
+    super()._reset()
+    self._offset = 0
+    self._tail = b""
+
+  def refresh(self):   # number of rows added
+    try:
+      size = os.path.getsize(self.path)
+    except OSError:
+      return 0
+    if size < self._offset:
+      # file was truncated or replaced
+      self._reset()
+    if size == self._offset:
+      return 0
+    with open(self.path, "rb") as f:
+      f.seek(self._offset)
+      chunk = f.read(size - self._offset)
+    self._offset += len(chunk)
+    chunk = self._tail + chunk
+    end = chunk.rfind(b"\n") + 1
+    self._tail = chunk[end:]
+    lines = [
+      line for line in chunk[:end].splitlines()
+      if line.strip() and not line.startswith(COLUMNS[0].encode())
+    ]
+    if not lines:
+      return 0
+    rows = np.loadtxt(
+      io.BytesIO(b"\n".join(lines)),
+      delimiter=",",
+      ndmin=2,
+      dtype=np.float64,
+    )
+    self._append(rows[:, :len(COLUMNS)])
+    return len(rows)
+
+
+class BinaryTelemetryIndex:
+  # memory-maps the fixed-record log written by mp/script.py with
+  # LOG_FORMAT = "bin", lookups read the mapped file directly, no parsing
+  def __init__(
+    self,
+    path,
+  ):
+    self.path = path
+    self._map = None
+    self._lock = threading.Lock()
+
+  def __len__(self):
+    return 0 if self._map is None else len(self._map)
+
+  def refresh(self):   # number of records added
+    try:
+      n = os.path.getsize(self.path) // RECORD_DTYPE.itemsize
+    except OSError:
+      return 0
+    old = len(self)
+    if n != old:
+      self._map = None if n == 0 else np.memmap(
+        self.path,
+        dtype=RECORD_DTYPE,
+        mode="r",
+        shape=(n,),
+      )
+    return max(0, n - old)
+
+  def _live(self):
+    # caller holds the lock
+    self.refresh()
+    if self._map is None:
+      raise LookupError(f"no telemetry in `{self.path}`.")
+    return self._map
+
+  def nearest(
+    self,
+    ts,
+  ):
+    with self._lock:
+      return _nearest(self._live(), ts)
+
+  def interpolate(
+    self,
+    ts,
+  ):
+    with self._lock:
+      return _interpolate(self._live(), ts)
+
+
+def open_index(
+  path,
+  **kwargs,
+):   # picks the reader from the file suffix
+  if str(path).endswith(".bin"):
+    return BinaryTelemetryIndex(path)
+  return TelemetryIndex(path, **kwargs)
+
+
+def _nearest(
+  live,   # (n, 4) rows sorted by timestamp
+  ts,
+):
+  stamps = live[:, 0]
+  i = int(np.searchsorted(stamps, ts))
+  if i == len(stamps) or (i > 0 and ts - stamps[i - 1] <= stamps[i] - ts):
+    i -= 1
+  return tuple(float(v) for v in live[i])
+
+
+def _interpolate(
+  live,   # (n, 4) rows sorted by timestamp
+  ts,
+):
+  stamps = live[:, 0]
+  i = int(np.searchsorted(stamps, ts))
+  if i == 0 or i == len(stamps):
+    # outside the recorded range, hold the edge sample
+    row = live[0 if i == 0 else -1]
+    return (
+      float(row[1]),
+      float(row[2]),
+      float(row[3]),
+      abs(ts - float(row[0])),
+    )
+  lo, hi = np.asarray(live[i - 1]), np.asarray(live[i])
+  span = hi[0] - lo[0]
+  w = (ts - lo[0]) / span if span > 0 else 0.0
+  lat, long, alt = lo[1:] + (hi[1:] - lo[1:]) * w
+  return (
+    float(lat),
+    float(long),
+    float(alt),
+    float(max(ts - lo[0], hi[0] - ts)),
+  )
@@ -1,33 +1,55 @@
+import time
+STARTUP_T0 = time.perf_counter()
+
 from dotenv import load_dotenv
 load_dotenv()
 
 import os
 import sys
-import time
 import argparse
+import threading
 
 from rich import print
 from pathlib import Path
-from hooks.client import send_trigger
-from adlibpredict import (
-    FrameCollector,
-    Detector
-  )
+
+
+REPORT_INTERVAL = 10.0
+FIRST_INFERENCE_TIMEOUT = 30.0
+
+
+def _print_startup(
+  timings,
+):
+  print("startup breakdown:")
+  for name, dt in timings:
+    print(f"  {name}: {dt:.2f}s")
+  print(f"  total: {time.perf_counter() - STARTUP_T0:.2f}s")
 
 
 def workflow(
   test=False
 ):
+  timings = []
+  t0 = time.perf_counter()
   if test:
     rtsp_url = "rtsp://localhost:8554/live"
   else:
     rtsp_url = os.environ.get("RTSP_URL")
     if not rtsp_url:
       print("environment variable `RTSP_URL` does not exist.")
+      sys.exit(1)
   interval_str = os.environ.get(
     "CHECK_INTERVAL",
     "1.0",
   )
+  batch_str = os.environ.get(
+    "BATCH_SIZE",
+    "1",
+  )
+  gate_str = os.environ.get(
+    "MOTION_MAX_SKIP",
+    "",
+  )
   model_path = os.environ.get("MODEL_PATH")
   if not model_path:
     print("environment variable `MODEL_PATH` does not exist.")
@@ -37,42 +59,172 @@ def workflow(
     sys.exit(1)
   try:
     interval = float(interval_str)
-    if interval <= 0:
-      raise ValueError("interval must be positive.")
+    if interval < 0:
+      raise ValueError("interval must not be negative.")
+  except ValueError:
+    print(f"interval string must be a non-negative number, but got `{interval_str}`.")
+    sys.exit()
+  try:
+    batch_size = int(batch_str)
+    if batch_size <= 0:
+      raise ValueError("batch size must be positive.")
   except ValueError:
-    print(f"interval string must be a number, but got `{interval_str}`.")
+    print(f"batch size must be a positive integer, but got `{batch_str}`.")
     sys.exit()
+  backend = os.environ.get("CAPTURE_BACKEND", "ffmpeg")
+  if backend not in ("ffmpeg", "gstreamer"):
+    print(f"capture backend must be `ffmpeg` or `gstreamer`, but got `{backend}`.")
+    sys.exit(1)
+  # on_demand only retrieves the frames the pipeline asks for, worth it
+  # whenever CHECK_INTERVAL is well above the stream's frame period
+  decode_mode = os.environ.get("DECODE_MODE", "all")
+  if decode_mode not in ("all", "on_demand"):
+    print(f"decode mode must be `all` or `on_demand`, but got `{decode_mode}`.")
+    sys.exit(1)
+  size_str = os.environ.get("CAPTURE_SIZE", "")
+  capture_size = None
+  if size_str:
+    try:
+      capture_size = tuple(int(v) for v in size_str.lower().split("x"))
+      if len(capture_size) != 2 or min(capture_size) <= 0:
+        raise ValueError("capture size must be <width>x<height>.")
+    except ValueError:
+      print(f"capture size must look like `640x360`, but got `{size_str}`.")
+      sys.exit(1)
+  max_skip = None
+  if gate_str:
+    try:
+      max_skip = float(gate_str)
+      if max_skip <= 0:
+        raise ValueError("max skip must be positive.")
+    except ValueError:
+      print(f"motion max skip must be a positive number, but got `{gate_str}`.")
+      sys.exit()
+  # several comma separated streams share one model, TRIGGER_URLS
+  # optionally routes each stream's triggers to its own server. gstreamer
+  # urls may be full pipelines whose caps contain commas, those are split
+  # on `;` instead
+  sep = ";" if backend == "gstreamer" else ","
+  rtsp_urls = [u.strip() for u in rtsp_url.split(sep) if u.strip()]
+  trigger_urls = [
+    u.strip() for u in os.environ.get("TRIGGER_URLS", "").split(",")
+    if u.strip()
+  ]
+  if trigger_urls and len(trigger_urls) != len(rtsp_urls):
+    print(f"`TRIGGER_URLS` has {len(trigger_urls)} entries for {len(rtsp_urls)} streams.")
+    sys.exit(1)
   print(f"rtsp url: `{rtsp_url}`")
   print(f"model path: `{model_path}`")
   print(f"interval: `{interval}`")
-  col = FrameCollector(
-    rtsp_url=rtsp_url,
+  print(f"batch size: `{batch_size}`")
+  print(f"capture: `{backend}` size `{capture_size}` decode `{decode_mode}`")
+  print(f"motion gate max skip: `{max_skip}`")
+  timings.append(("validate", time.perf_counter() - t0))
+
+  # heavy imports only once the configuration is known to be usable
+  t0 = time.perf_counter()
+  from hooks.client import (
+      TriggerCoalescer,
+      TriggerSender,
+    )
+  from hooks.client.handler import URL as DEFAULT_TRIGGER_URL
+  from adlibpredict import (
+      CollectorPool,
+      FrameCollector,
+      Detector,
+      MotionGate,
+      Pipeline,
+    )
+  timings.append(("imports", time.perf_counter() - t0))
+
+  # load + warm the model while the rtsp connection is being set up
+  det = Detector(
+    model_path,
+    letterbox=os.environ.get("LETTERBOX", "0") == "1",
   )
-  det = Detector(model_path)
-  det.load()
-  while True:
+  load_errors = []
+
+  def _load_model():
     try:
-      loop_start = time.perf_counter()
-      frame_ts, frame = col.read()
-      if frame is None:
-        print("frame is not read or lost.")
-      else:
-        res = det.is_detected(
-          frame,
-          frame_ts,
-        )
-        print(f"detection result: {res}")
-        if res != -1.0:
-          send_trigger(res)
-          print("trigger sent.")
-        elapsed = time.perf_counter() - loop_start
-        time.sleep(max(0, interval - elapsed))
-    except KeyboardInterrupt:
-      print("interrupted by user.")
-      break
-    except Exception as exc:
-      print(f"exception: {exc}")
-      time.sleep(1)
+      t0 = time.perf_counter()
+      det.load()
+      timings.append(("model load", time.perf_counter() - t0))
+      t0 = time.perf_counter()
+      det.warmup()
+      timings.append(("model warmup", time.perf_counter() - t0))
+    except Exception as e:
+      load_errors.append(e)
+
+  loader = threading.Thread(
+    target=_load_model,
+    daemon=True,
+  )
+  loader.start()
+  t0 = time.perf_counter()
+  names = [f"stream{i}" for i in range(len(rtsp_urls))]
+  col = CollectorPool({
+    name: FrameCollector(
+      rtsp_url=url,
+      ring_size=max(3, batch_size + 1),
+      name=name,
+      backend=backend,
+      ffmpeg_options=os.environ.get("FFMPEG_OPTIONS"),
+      hw_accel=os.environ.get("HW_ACCEL", "0") == "1",
+      size=capture_size,
+      gst_decoder=os.environ.get("GST_DECODER", "decodebin"),
+      decode=decode_mode,
+    )
+    for name, url in zip(names, rtsp_urls)
+  })
+  routes = dict(zip(names, trigger_urls or [DEFAULT_TRIGGER_URL] * len(names)))
+  timings.append(("rtsp connect", time.perf_counter() - t0))
+  loader.join()
+  if load_errors:
+    print(f"model loading failed: {load_errors[0]}")
+    col.stop()
+    sys.exit(1)
+  # one background sender per server, a link outage buffers and retries
+  # triggers instead of blocking or dropping them
+  senders = {url: TriggerSender(url) for url in set(routes.values())}
+  pipe = Pipeline(
+    col,
+    det,
+    lambda d: senders[routes[d.stream]].submit(d.ts, d.conf, d.xyxy),
+    interval,
+    batch_size=batch_size,
+    gate=None if max_skip is None else lambda: MotionGate(
+      max_skip=max_skip,
+      crop=os.environ.get("MOTION_CROP", "0") == "1",
+    ),
+    coalescer=TriggerCoalescer,
+  )
+  pipe.start()
+  try:
+    t0 = time.perf_counter()
+    # bounded, inference may keep failing (bad export, stalled streams) and
+    # the report loop below is what shows why
+    deadline = t0 + FIRST_INFERENCE_TIMEOUT
+    while pipe.stats["inference"].count == 0 and time.perf_counter() < deadline:
+      time.sleep(0.01)
+    if pipe.stats["inference"].count:
+      timings.append(("first inference", time.perf_counter() - t0))
+    else:
+      print(f"no successful inference within {FIRST_INFERENCE_TIMEOUT:.0f}s, reporting anyway.")
+    _print_startup(timings)
+    while True:
+      time.sleep(REPORT_INTERVAL)
+      pipe.report()
+      for name, health in col.health().items():
+        print(f"{name}: {health}")
+      for url, sender in senders.items():
+        print(f"{url}: pending={sender.pending()} dropped={sender.dropped}")
+  except KeyboardInterrupt:
+    print("interrupted by user.")
+  finally:
+    pipe.stop()
+    col.stop()
+    for sender in senders.values():
+      sender.stop()
 
 
 def main():
@@ -0,0 +1,99 @@
+import os
+import sys
+import time
+import statistics
+
+sys.path.extend([
+  os.path.abspath(os.path.join(os.path.dirname(__file__), ".")),
+  os.path.abspath(os.path.join(os.path.dirname(__file__), "..")),
+])
+
+import cv2
+
+from rich import print
+from rich.table import Table
+from ultralytics import YOLO
+from adlibpredict import Detector
+
+
+TRAINED_WEIGHTS = os.path.abspath(os.path.join(
+  os.path.dirname(__file__),
+  "./weights/trained/yolov11m.pt",
+))
+BENCH_IMAGES_DIR = os.path.abspath(os.path.join(
+  os.path.dirname(__file__),
+  "../tests/images/inputs/",
+))
+FORMATS = [
+  "onnx",
+  "openvino",
+  "torchscript",
+]
+IMGSZ = 640
+WARMUP_RUNS = 3
+BENCH_RUNS = 20
+
+
+def export_all(
+  weights,
+  formats,
+):   # {format: exported path}
+  model = YOLO(weights)
+  exported = {}
+  for fmt in formats:
+    print(f"Exporting `{weights}` to {fmt}...")
+    try:
+      exported[fmt] = model.export(
+        format=fmt,
+        imgsz=IMGSZ,
+        device="cpu",
+      )
+    except Exception as e:
+      print(f"[red]export to {fmt} failed:[/red] {e}")
+  return exported
+
+
+def bench(
+  model_path,
+  frames,
+):   # (warmup seconds, [per-frame seconds])
+  det = Detector(model_path, imgsz=IMGSZ)
+  det.load()
+  warm = det.warmup(WARMUP_RUNS, frames[0].shape)
+  times = []
+  for i in range(BENCH_RUNS):
+    frame = frames[i % len(frames)]
+    t0 = time.perf_counter()
+    det.detect(frame, 0.0)
+    times.append(time.perf_counter() - t0)
+  return warm, times
+
+
+def main():
+  frames = [
+    cv2.imread(os.path.join(BENCH_IMAGES_DIR, f))
+    for f in sorted(os.listdir(BENCH_IMAGES_DIR))
+  ]
+  frames = [f for f in frames if f is not None]
+  if not frames:
+    print("No benchmark images found.")
+    sys.exit(1)
+  backends = {"pytorch": TRAINED_WEIGHTS}
+  backends.update(export_all(TRAINED_WEIGHTS, FORMATS))
+  table = Table(title=f"per-frame latency ({BENCH_RUNS} runs, cpu)")
+  for col in ("backend", "warm", "mean", "p50", "max"):
+    table.add_column(col)
+  for name, path in backends.items():
+    warm, times = bench(path, frames)
+    table.add_row(
+      name,
+      f"{warm * 1e3:.1f}ms",
+      f"{statistics.mean(times) * 1e3:.1f}ms",
+      f"{statistics.median(times) * 1e3:.1f}ms",
+      f"{max(times) * 1e3:.1f}ms",
+    )
+  print(table)
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,128 @@
+import os
+import sys
+import yaml
+import shutil
+
+from pathlib import Path
+from rich import print
+from rich.table import Table
+from ultralytics import YOLO
+
+
+COCO_DATASET = os.path.abspath(os.path.join(
+  os.path.dirname(__file__),
+  "./dataset/coco/data.yaml",
+))
+TRAINED_WEIGHTS = os.path.abspath(os.path.join(
+  os.path.dirname(__file__),
+  "./weights/trained/yolov11m.pt",
+))
+IMGSZ = 640
+# INT8 calibration images, a slice of the dataset's val split that is
+# held out of every variant's evaluation
+CALIBRATION_FRACTION = 0.25
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+def split_dataset(
+  data_yaml,
+):   # (calibration yaml, held out yaml)
+  # preprocess.py points val at the train images, so calibrating and
+  # scoring on it would grade int8 on its own calibration set
+  with open(data_yaml) as f:
+    data = yaml.safe_load(f)
+  root = Path(data["path"])
+  images = sorted(
+    p for p in (root / data["val"]).iterdir()
+    if p.suffix.lower() in IMAGE_EXTS
+  )
+  n = max(1, round(len(images) * CALIBRATION_FRACTION))
+  if len(images) <= n:
+    raise ValueError(f"need more than {n} images to hold out a validation set.")
+  paths = {}
+  for split, files in (("calibration", images[:n]), ("holdout", images[n:])):
+    listing = root / f"{split}.txt"
+    listing.write_text("".join(f"{p}\n" for p in files))
+    split_yaml = root / f"{split}.yaml"
+    with open(split_yaml, "w") as f:
+      yaml.safe_dump({**data, "val": listing.name}, f, sort_keys=False)
+    paths[split] = str(split_yaml)
+    print(f"{split}: {len(files)} images")
+  return paths["calibration"], paths["holdout"]
+
+
+def export_variants(
+  weights,
+  calibration_data,
+):   # {variant: model path}
+  model = YOLO(weights)
+  variants = {"fp32": weights}
+  print("Exporting FP16 OpenVINO model...")
+  fp16 = model.export(
+    format="openvino",
+    imgsz=IMGSZ,
+    half=True,
+    device="cpu",
+  )
+  # the fp16 export shares its name with a plain openvino export
+  fp16_dir = fp16.rstrip("/\\").replace("_openvino_model", "_fp16_openvino_model")
+  shutil.rmtree(fp16_dir, ignore_errors=True)
+  shutil.move(fp16, fp16_dir)
+  variants["fp16"] = fp16_dir
+  print("Exporting static INT8 OpenVINO model...")
+  variants["int8"] = model.export(
+    format="openvino",
+    imgsz=IMGSZ,
+    int8=True,
+    data=calibration_data,
+    device="cpu",
+  )
+  return variants
+
+
+def evaluate(
+  model_path,
+  data,
+):   # (mAP50, mAP50-95, inference ms/img, total ms/img)
+  metrics = YOLO(model_path, task="detect").val(
+    data=data,
+    imgsz=IMGSZ,
+    batch=1,
+    device="cpu",
+    plots=False,
+    verbose=False,
+  )
+  speed = metrics.speed
+  return (
+    metrics.box.map50,
+    metrics.box.map,
+    speed["inference"],
+    speed["preprocess"] + speed["inference"] + speed["postprocess"],
+  )
+
+
+def main():
+  if not os.path.exists(COCO_DATASET):
+    print(f"dataset config `{COCO_DATASET}` does not exist, run preprocess.py first.")
+    sys.exit(1)
+  calibration_data, holdout_data = split_dataset(COCO_DATASET)
+  variants = export_variants(TRAINED_WEIGHTS, calibration_data)
+  table = Table(title="accuracy (held out images) vs latency (cpu, batch 1)")
+  for col in ("variant", "mAP50", "mAP50-95", "infer", "total", "path"):
+    table.add_column(col)
+  for name, path in variants.items():
+    map50, map5095, infer_ms, total_ms = evaluate(path, holdout_data)
+    table.add_row(
+      name,
+      f"{map50:.3f}",
+      f"{map5095:.3f}",
+      f"{infer_ms:.1f}ms",
+      f"{total_ms:.1f}ms",
+      str(path),
+    )
+  print(table)
+  print("select a variant by pointing `MODEL_PATH` at its path.")
+
+
+if __name__ == "__main__":
+  main()
@@ -2,17 +2,26 @@ import sys
 import clr
 import time
 import os
+import struct
 import System
 import MissionPlanner
 
 
+# "csv" -> tll.csv text rows, "bin" -> tll.bin packed little-endian float64
+# records of (timestamp, lat, lng, alt), 32 bytes each
+LOG_FORMAT = "csv"
+# seconds between fsyncs, 0 syncs every sample
+FSYNC_INTERVAL = 1.0
+RECORD = struct.Struct("<dddd")
+
+
 cache_dir = System.Environment.GetFolderPath(
   System.Environment.SpecialFolder.LocalApplicationData,
 )
 nidar_dir = os.path.join(cache_dir, "nidar")
 if not os.path.exists(nidar_dir):
   os.makedirs(nidar_dir)
-file_path = os.path.join(nidar_dir, "tll.csv")
+file_path = os.path.join(nidar_dir, "tll.bin" if LOG_FORMAT == "bin" else "tll.csv")
 print(f"logging file path: `{file_path}`")
 
 
@@ -33,29 +42,43 @@ def GetMasterState():
   return None
 
 
-if not os.path.exists(file_path):
+if LOG_FORMAT != "bin" and not os.path.exists(file_path):
   with open(file_path, "w") as f:
     f.write("Timestamp,Latitude,Longitude,Altitude\n")
 
 
+def write_sample(f, timestamp, lat, lng, alt):
+  if LOG_FORMAT == "bin":
+    f.write(RECORD.pack(timestamp, lat, lng, alt))
+  else:
+    f.write(("%f,%f,%f,%f\n" % (timestamp, lat, lng, alt)).encode())
+
+
 print("started logging ...")
 
 
-while True:
-  master = GetMasterState()
-  if master is not None:
-    try:
-      timestamp = time.time()
-      lat = master.lat
-      lng = master.lng
-      alt = master.alt
-      with open(file_path, "a") as f:
-        f.write("%f,%f,%f,%f\n" % (timestamp, lat, lng, alt))
-        f.flush()
-        os.fsync(f.fileno())
-      print("LOGGED: %f" % timestamp)
-    except Exception as e:
-      print("DATA ERROR: " + str(e))
-  else:
-    print("waiting for vehicle SYSID 1...")
-  Script.Sleep(100)
+# the file stays open, data is flushed every sample so readers see it and
+# fsynced at most every FSYNC_INTERVAL seconds
+log_file = open(file_path, "ab")
+last_sync = time.time()
+try:
+  while True:
+    master = GetMasterState()
+    if master is not None:
+      try:
+        timestamp = time.time()
+        write_sample(log_file, timestamp, master.lat, master.lng, master.alt)
+        log_file.flush()
+        if timestamp - last_sync >= FSYNC_INTERVAL:
+          os.fsync(log_file.fileno())
+          last_sync = timestamp
+        print("LOGGED: %f" % timestamp)
+      except Exception as e:
+        print("DATA ERROR: " + str(e))
+    else:
+      print("waiting for vehicle SYSID 1...")
+    Script.Sleep(100)
+finally:
+  log_file.flush()
+  os.fsync(log_file.fileno())
+  log_file.close()
@@ -1,7 +1,10 @@
 import os
+import re
 import sys
 import time
+import shutil
 import signal
+import tempfile
 import multiprocessing as mp
 
 import gi
@@ -19,6 +22,14 @@ VIDEO_WIDTH = 1280
 VIDEO_HEIGHT = 720
 VIDEO_FPS = 30
 VIDEO_BITRATE = 2000
+FEED_SOURCE = "camera"
+TEST_PATTERN = "smpte"
+FEED_SOURCES = ("camera", "testsrc", "file", "images")
+IMAGE_CAPS = {
+  ".jpg": "image/jpeg",
+  ".jpeg": "image/jpeg",
+  ".png": "image/png",
+}
 
 
 class CameraFeeder:
@@ -29,14 +40,93 @@ class CameraFeeder:
     video_width,
     video_height,
     video_fps,
+    source=FEED_SOURCE,   # "camera" | "testsrc" | "file" | "images"
+    source_path=None,     # file: video path, images: directory or %d pattern
+    pattern=TEST_PATTERN, # testsrc only, videotestsrc pattern
   ):
+    if source not in FEED_SOURCES:
+      raise ValueError(f"unknown feed source `{source}`.")
+    if source in ("file", "images") and not source_path:
+      raise ValueError(f"feed source `{source}` needs a source path.")
     self.camera_dev = camera_dev
     self.shm_socket = shm_socket
     self.video_width = video_width
     self.video_height = video_height
     self.video_fps = video_fps
+    self.source = source
+    self.source_path = source_path
+    self.pattern = pattern
     self.pipeline = None
     self.loop = None
+    self._stopping = False
+    self._frames_dir = None
+
+  def _image_location(
+    self,
+  ):   # (multifilesrc location, caps mime)
+    location = self.source_path
+    if os.path.isdir(location):
+      location = self._link_frames(location)
+    ext = os.path.splitext(location)[1].lower()
+    if ext not in IMAGE_CAPS:
+      raise ValueError(f"unsupported image type `{ext}`.")
+    return location, IMAGE_CAPS[ext]
+
+  def _link_frames(
+    self,
+    directory,
+  ):   # %05d location over the directory's images in natural order
+    # multifilesrc only walks index patterns, so arbitrarily named images
+    # are symlinked into a temporary sequence
+    names = sorted(
+      (n for n in os.listdir(directory) if os.path.splitext(n)[1].lower() in IMAGE_CAPS),
+      key=lambda n: [int(t) if t.isdigit() else t for t in re.split(r"(\d+)", n)],
+    )
+    if not names:
+      raise ValueError(f"no images found in `{directory}`.")
+    # one caps mime per stream, other image types are left out
+    ext = os.path.splitext(names[0])[1].lower()
+    mime = IMAGE_CAPS[ext]
+    frames = [n for n in names if IMAGE_CAPS[os.path.splitext(n)[1].lower()] == mime]
+    if len(frames) < len(names):
+      print(f"Warning: skipping {len(names) - len(frames)} images that are not {mime}")
+    self._frames_dir = tempfile.mkdtemp(prefix="camera-feeder-")
+    for i, name in enumerate(frames):
+      os.symlink(
+        os.path.abspath(os.path.join(directory, name)),
+        os.path.join(self._frames_dir, f"{i:05d}{ext}"),
+      )
+    return os.path.join(self._frames_dir, f"%05d{ext}")
+
+  def _source_str(
+    self,
+  ):   # pipeline head up to raw frames at the feed rate
+    if self.source == "camera":
+      return f"""
+    v4l2src device={self.camera_dev} io-mode=2
+    ! image/jpeg,framerate={self.video_fps}/1
+    ! jpegdec
+    ! videorate max-rate={self.video_fps} drop-only=true"""
+    if self.source == "testsrc":
+      return f"""
+    videotestsrc is-live=true pattern={self.pattern}
+    ! video/x-raw,framerate={self.video_fps}/1"""
+    # local media is not live, identity sync=true paces it to the clock
+    # since shmsink itself does not sync
+    if self.source == "file":
+      return f"""
+    filesrc location="{self.source_path}"
+    ! decodebin
+    ! videoconvert
+    ! videorate
+    ! video/x-raw,framerate={self.video_fps}/1
+    ! identity sync=true"""
+    location, mime = self._image_location()
+    return f"""
+    multifilesrc location="{location}" loop=true caps="{mime},framerate={self.video_fps}/1"
+    ! decodebin
+    ! videoconvert
+    ! identity sync=true"""
 
   def _make_pipeline(
     self,
@@ -46,11 +136,7 @@ class CameraFeeder:
         os.unlink(self.shm_socket)
     except Exception as e:
       print(f"Warning: Could not remove old socket: {e}")
-    pipeline_str = f"""
-    v4l2src device={self.camera_dev} io-mode=2
-    ! image/jpeg,framerate={self.video_fps}/1
-    ! jpegdec
-    ! videorate max-rate={self.video_fps} drop-only=true
+    pipeline_str = f"""{self._source_str()}
     ! videoscale
     ! videoconvert
     ! video/x-raw,format=I420,width={self.video_width},height={self.video_height},framerate={self.video_fps}/1,pixel-aspect-ratio=1/1
@@ -72,6 +158,16 @@ class CameraFeeder:
       print(f"Camera Feeder Error: {err}, {debug}")
       if self.loop:
         self.loop.quit()
+    elif msg.type == Gst.MessageType.EOS and self.source == "file" and not self._stopping:
+      # loop the video, a flushing seek also resets the running time
+      if not self.pipeline.seek_simple(
+        Gst.Format.TIME,
+        Gst.SeekFlags.FLUSH | Gst.SeekFlags.KEY_UNIT,
+        0,
+      ):
+        print("Camera feeder could not rewind the video")
+        if self.loop:
+          self.loop.quit()
     elif msg.type == Gst.MessageType.EOS:
       print("Camera feeder received EOS")
       if self.loop:
@@ -81,7 +177,11 @@ class CameraFeeder:
     self,
   ):
     try:
-      print(f"Starting camera feeder from {self.camera_dev}")
+      origin = {
+        "camera": self.camera_dev,
+        "testsrc": f"videotestsrc pattern={self.pattern}",
+      }.get(self.source, self.source_path)
+      print(f"Starting camera feeder from {origin}")
       self.pipeline = self._make_pipeline()
       self.loop = GLib.MainLoop()
       ret = self.pipeline.set_state(Gst.State.PLAYING)
@@ -94,10 +194,13 @@ class CameraFeeder:
     finally:
       if self.pipeline:
         self.pipeline.set_state(Gst.State.NULL)
+      if self._frames_dir is not None:
+        shutil.rmtree(self._frames_dir, ignore_errors=True)
 
   def stop(
     self,
   ):
+    self._stopping = True
     if self.pipeline:
       self.pipeline.send_event(Gst.Event.new_eos())
     time.sleep(0.5)
@@ -176,6 +279,9 @@ def camera_feeder_process(
   video_width,
   video_height,
   video_fps,
+  source=FEED_SOURCE,
+  source_path=None,
+  pattern=TEST_PATTERN,
 ):
   feeder = CameraFeeder(
     camera_dev,
@@ -183,6 +289,9 @@ def camera_feeder_process(
     video_width,
     video_height,
     video_fps,
+    source,
+    source_path,
+    pattern,
   )
   feeder.run()
 
@@ -214,11 +323,25 @@ def main():
   video_height = int(os.getenv("VIDEO_HEIGHT", VIDEO_HEIGHT))
   video_fps = int(os.getenv("VIDEO_FPS", VIDEO_FPS))
   video_bitrate = int(os.getenv("VIDEO_BITRATE", VIDEO_BITRATE))
+  # testsrc / file / images serve synthetic or recorded frames, so the
+  # capture -> detect -> trigger path can be benchmarked without a camera
+  feed_source = os.getenv("FEED_SOURCE", FEED_SOURCE)
+  feed_path = os.getenv("FEED_PATH")
+  test_pattern = os.getenv("TEST_PATTERN", TEST_PATTERN)
+  if feed_source not in FEED_SOURCES:
+    print(f"FEED_SOURCE must be one of {', '.join(FEED_SOURCES)}, but got `{feed_source}`.")
+    sys.exit(1)
+  if feed_source in ("file", "images") and not feed_path:
+    print(f"FEED_SOURCE `{feed_source}` needs FEED_PATH.")
+    sys.exit(1)
 
   print("=" * 60)
   print("RTSP Server with Camera Feeder")
   print("=" * 60)
-  print(f"Camera: {camera_dev}")
+  if feed_source == "camera":
+    print(f"Camera: {camera_dev}")
+  else:
+    print(f"Source: {feed_source} {feed_path or test_pattern}")
   print(f"Resolution: {video_width}x{video_height} @ {video_fps}fps")
   print(f"Bitrate: {video_bitrate} kbps")
   print(f"RTSP Port: {rtsp_port}")
@@ -227,7 +350,10 @@ def main():
   mp.set_start_method("fork", force=True)
   feeder_proc = mp.Process(
     target=camera_feeder_process,
-    args=(camera_dev, shm_socket, video_width, video_height, video_fps),
+    args=(
+      camera_dev, shm_socket, video_width, video_height, video_fps,
+      feed_source, feed_path, test_pattern,
+    ),
     name="camera_feeder"
   )
   rtsp_proc = mp.Process(
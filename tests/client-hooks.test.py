@@ -8,6 +8,25 @@ sys.path.extend([
 ])
 
 from rich import print
-from hooks.client import send_trigger
+from hooks.client import (
+    TriggerSender,
+    send_trigger,
+    send_triggers,
+  )
 
 print(send_trigger(time.time()))
+
+t0 = time.time()
+print(send_triggers([
+  {"timestamp": t0 + i * 0.5, "confidence": 0.5 + i * 0.1, "bbox": [0, 0, 10, 10]}
+  for i in range(5)
+]))
+
+sender = TriggerSender(maxlen=4)
+t0 = time.perf_counter()
+for i in range(8):
+  sender.submit(time.time())
+print(f"8 submits took {(time.perf_counter() - t0) * 1e3:.2f}ms, dropped={sender.dropped}")
+time.sleep(2)
+print(f"pending after 2s: {sender.pending()}")
+sender.stop()
@@ -46,3 +46,25 @@ for idx, img_path in enumerate(images):
     min_conf=0.3,
   )
   print(detected_ts)
+  print(detector.detect(
+    frame=frame,
+    frame_ts=frame_ts,
+    class_id=None,
+    min_conf={0: 0.3},
+    min_area=16 * 16,
+  ))
+
+frames = [cv2.imread(p) for p in images]
+items = [(time.time(), f) for f in frames if f is not None]
+print(detector.is_detected_batch(
+  items,
+  min_conf=0.3,
+))
+
+lb_detector = Detector(model_path, letterbox=True)
+lb_detector.load()
+for img_path in images:
+  frame = cv2.imread(img_path)
+  if frame is None:
+    continue
+  print(detector.detect(frame, 0.0), lb_detector.detect(frame, 0.0))
@@ -0,0 +1,49 @@
+import os
+import sys
+import time
+import threading
+
+sys.path.extend([
+  os.path.abspath(os.path.join(os.path.dirname(__file__), ".")),
+  os.path.abspath(os.path.join(os.path.dirname(__file__), "..")),
+])
+
+from rich import print
+from pymavlink import mavutil
+from hooks.server.mavproxy import start_telemetry
+from hooks.server.mavproxy._telemetry import PositionBuffer
+
+PORT = 14561
+
+
+def fake_vehicle():
+  out = mavutil.mavlink_connection(
+    f"udpout:localhost:{PORT}",
+    source_system=1,
+  )
+  t0 = time.time()
+  while True:
+    out.mav.heartbeat_send(
+      mavutil.mavlink.MAV_TYPE_QUADROTOR,
+      mavutil.mavlink.MAV_AUTOPILOT_ARDUPILOTMEGA,
+      0, 0, 0,
+    )
+    for _ in range(10):
+      dt = time.time() - t0
+      out.mav.global_position_int_send(
+        int(dt * 1000),
+        int((12.9716 + dt * 1e-5) * 1e7),
+        int((77.5946 + dt * 1e-5) * 1e7),
+        0,
+        int(30 * 1e3),
+        0, 0, 0, 0,
+      )
+      time.sleep(0.1)
+
+
+threading.Thread(target=fake_vehicle, daemon=True).start()
+buffer = PositionBuffer()
+start_telemetry(f"udpin:localhost:{PORT}", buffer)
+time.sleep(3)
+print(f"samples: {len(buffer)}")
+print(f"interpolated: {buffer.interpolate(time.time() - 1.0)}")
@@ -0,0 +1,33 @@
+import os
+import sys
+import cv2
+
+sys.path.extend([
+  os.path.abspath(os.path.join(os.path.dirname(__file__), ".")),
+  os.path.abspath(os.path.join(os.path.dirname(__file__), "..")),
+])
+
+from rich import print
+from adlibpredict import MotionGate
+
+root = os.path.dirname(__file__)
+input_dir = os.path.join(root, "./images/inputs/")
+a = cv2.imread(os.path.join(input_dir, "0.png"))
+# same size as `a` with one local change, so the gate crops instead of
+# resetting its reference on a shape change
+h, w = a.shape[:2]
+rect = (w // 3, h // 3, w // 3 + w // 8, h // 3 + h // 8)
+b = a.copy()
+cv2.rectangle(b, rect[:2], rect[2:], (0, 0, 255), -1)
+
+gate = MotionGate(max_skip=5.0, crop=True)
+for ts, frame in [(0.0, a), (0.5, a), (1.0, a), (1.5, b), (2.0, b), (7.0, b)]:
+  run, roi = gate.check(frame, ts)
+  print(f"ts={ts}: run={run}, roi={roi}, score={gate.score:.4f}")
+  if roi is not None:
+    covered = (
+      roi[0] <= rect[0] and roi[1] <= rect[1]
+      and roi[2] >= rect[2] and roi[3] >= rect[3]
+    )
+    print(f"  crop={frame[roi[1]:roi[3], roi[0]:roi[2]].shape}, covers change={covered}")
+print(f"skipped: {gate.skipped}")
@@ -0,0 +1,196 @@
+import os
+import sys
+import time
+import random
+import threading
+import numpy as np
+
+sys.path.extend([
+  os.path.abspath(os.path.join(os.path.dirname(__file__), ".")),
+  os.path.abspath(os.path.join(os.path.dirname(__file__), "..")),
+])
+
+from rich import print
+from adlibpredict import (
+    CollectorPool,
+    Detection,
+    MotionGate,
+    Pipeline,
+  )
+from hooks.client import TriggerCoalescer
+
+
+class FakeLease:
+  def __init__(self, seq, stream, frame=None):
+    self.seq = seq
+    self.stream = stream
+    self.ts = time.time()
+    self.frame = frame
+
+  def release(self):
+    pass
+
+
+class FakeCollector:
+  def __init__(self, name=None, fps=30):
+    self.name = name
+    self._fps = fps
+    self._seq = 0
+    self._t0 = time.time()
+    self._listeners = []
+
+  def add_listener(self, fn):
+    self._listeners.append(fn)
+
+  @property
+  def seq(self):
+    return int((time.time() - self._t0) * self._fps)
+
+  def request_frame(self):
+    return False
+
+  def lease_recent(self, n=None, after_seq=0, timeout=0):
+    seq = int((time.time() - self._t0) * self._fps)
+    if seq <= after_seq:
+      time.sleep(min(timeout or 0, 1 / self._fps))
+      seq = int((time.time() - self._t0) * self._fps)
+      if seq <= after_seq:
+        return []
+    return [FakeLease(seq, self.name)]
+
+
+class FakeOnDemandCollector(FakeCollector):
+  # decodes one frame a frame period after being asked, like on_demand mode
+  def __init__(self, name=None, fps=30):
+    super().__init__(name, fps)
+    self._decoded = 0
+    self.requests = 0
+
+  @property
+  def seq(self):
+    return self._decoded
+
+  def _publish(self):
+    self._decoded = super().seq
+    for fn in self._listeners:
+      fn()
+
+  def request_frame(self):
+    self.requests += 1
+    threading.Timer(1 / self._fps, self._publish).start()
+    return True
+
+  def lease_recent(self, n=None, after_seq=0, timeout=0):
+    if self._decoded <= after_seq:
+      return []
+    return [FakeLease(self._decoded, self.name)]
+
+
+class FakeSceneCollector(FakeCollector):
+  # a static scene that gets a white square after `change_at` seconds
+  def __init__(self, name=None, fps=30, change_at=1.0):
+    super().__init__(name, fps)
+    self._change_at = change_at
+    self.static = np.zeros((240, 320, 3), dtype=np.uint8)
+    self.changed = self.static.copy()
+    self.changed[100:140, 200:260] = 255
+
+  def lease_recent(self, n=None, after_seq=0, timeout=0):
+    got = super().lease_recent(n, after_seq, timeout)
+    changed = time.time() - self._t0 >= self._change_at
+    for l in got:
+      l.frame = self.changed if changed else self.static
+    return got
+
+
+class FakeDetector:
+  def detect(self, frame, frame_ts):
+    time.sleep(0.05)
+    return Detection(frame_ts, 0, random.random(), (0.0, 0.0, 1.0, 1.0))
+
+  def detect_batch(self, items):
+    time.sleep(0.05 + 0.01 * len(items))
+    return [
+      Detection(ts, 0, random.random(), (0.0, 0.0, 1.0, 1.0))
+      for ts, _ in items
+    ]
+
+
+def slow_sender(det):
+  time.sleep(0.5)
+
+
+print("Starting pipeline with a slow trigger sender...")
+pipe = Pipeline(
+  FakeCollector(),
+  FakeDetector(),
+  slow_sender,
+  interval=0.1,
+)
+pipe.start()
+time.sleep(3)
+pipe.stop()
+pipe.report()
+
+print("Starting pipeline with trigger coalescing...")
+pipe = Pipeline(
+  FakeCollector(),
+  FakeDetector(),
+  lambda det: print(f"sent {det}"),
+  interval=0.1,
+  coalescer=lambda: TriggerCoalescer(window=1.0, hold=0.3),
+)
+pipe.start()
+time.sleep(3)
+pipe.stop()
+pipe.report()
+
+print("Starting pipeline over a pool of 3 streams, batched...")
+pool = CollectorPool({
+  name: FakeCollector(name, fps)
+  for name, fps in (("cam0", 30), ("cam1", 15), ("cam2", 5))
+})
+pipe = Pipeline(
+  pool,
+  FakeDetector(),
+  lambda det: print(f"routed to {det.stream}: {det}"),
+  interval=0.1,
+  batch_size=3,
+  coalescer=lambda: TriggerCoalescer(window=1.0, hold=0.3),
+)
+pipe.start()
+time.sleep(3)
+pipe.stop()
+pipe.report()
+
+print("Starting pipeline over on-demand streams...")
+pool = CollectorPool({
+  name: FakeOnDemandCollector(name, fps)
+  for name, fps in (("cam0", 30), ("cam1", 10))
+})
+pipe = Pipeline(
+  pool,
+  FakeDetector(),
+  lambda det: print(f"routed to {det.stream}: {det}"),
+  interval=0.5,
+  batch_size=2,
+)
+pipe.start()
+time.sleep(3)
+pipe.stop()
+pipe.report()
+for name in pool.names:
+  print(f"{name}: requests={pool[name].requests}")
+
+print("Starting pipeline with a cropping motion gate...")
+pipe = Pipeline(
+  FakeSceneCollector(),
+  FakeDetector(),
+  lambda det: print(f"box in frame coordinates: {det.xyxy}"),
+  interval=0.1,
+  gate=lambda: MotionGate(max_skip=5.0, crop=True),
+)
+pipe.start()
+time.sleep(2)
+pipe.stop()
+pipe.report()
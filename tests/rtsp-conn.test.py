@@ -2,6 +2,7 @@ from dotenv import load_dotenv
 load_dotenv()
 
 import os
+import re
 import sys
 import time
 
@@ -10,6 +11,7 @@ sys.path.extend([
   os.path.abspath(os.path.join(os.path.dirname(__file__), "..")),
 ])
 
+import cv2
 from rich import print
 from adlibpredict import FrameCollector
 
@@ -27,5 +29,66 @@ for i in range(10):
   else:
     print(f"Frame {i+1}: None")
   time.sleep(0.5)
+print("Testing frame leases...")
+for i in range(10):
+  lease = rec.lease()
+  if lease is None:
+    print(f"Lease {i+1}: None")
+  else:
+    with lease:
+      print(f"Lease {i+1}: Seq={lease.seq}, Writeable={lease.frame.flags.writeable}, Timestamp={lease.ts}")
+  time.sleep(0.1)
+print("Testing frame arrival notification...")
+seq = rec.seq
+for i in range(10):
+  lease = rec.wait_for_new_frame(seq, timeout=1.0)
+  if lease is None:
+    print(f"Wait {i+1}: timed out")
+    continue
+  with lease:
+    print(f"Wait {i+1}: Seq={lease.seq}, Skipped={lease.seq - seq - 1}, Age={time.time() - lease.ts:.3f}s")
+    seq = lease.seq
+print(f"Health: {rec.health()}")
 print("Stopping frame collector...")
 rec.stop()
+
+print("Testing on-demand decoding...")
+lazy = FrameCollector(
+  rtsp_url="rtsp://localhost:8554/live",
+  decode="on_demand",
+)
+seq = lazy.seq
+for i in range(5):
+  lease = lazy.wait_for_new_frame(seq, timeout=1.0)
+  if lease is None:
+    print(f"On-demand {i+1}: timed out")
+    continue
+  with lease:
+    print(f"On-demand {i+1}: Seq={lease.seq}, Age={time.time() - lease.ts:.3f}s")
+    seq = lease.seq
+  time.sleep(0.5)
+for i in range(3):
+  ts, frame = lazy.read()
+  print(f"On-demand read {i+1}: Seq={lazy.seq}, Timestamp={ts}")
+  time.sleep(0.3)
+health = lazy.health()
+print(f"On-demand: grabbed={health['grabbed']} decoded={health['decoded']}")
+lazy.stop()
+
+# pip opencv wheels are built without gstreamer, the collector would only retry
+if re.search(r"GStreamer:\s+YES", cv2.getBuildInformation()):
+  print("Testing GStreamer capture scaled to 640x360...")
+  gst = FrameCollector(
+    rtsp_url="rtsp://localhost:8554/live",
+    backend="gstreamer",
+    size=(640, 360),
+  )
+  time.sleep(2)
+  ts, frame = gst.read()
+  if frame is not None:
+    print(f"GStreamer frame: Shape={frame.shape}, Timestamp={ts}")
+  else:
+    print("GStreamer frame: None")
+  gst.stop()
+else:
+  print("Skipping GStreamer capture, opencv has no GStreamer support.")
@@ -0,0 +1,59 @@
+import os
+import sys
+import time
+import struct
+import tempfile
+
+sys.path.extend([
+  os.path.abspath(os.path.join(os.path.dirname(__file__), ".")),
+  os.path.abspath(os.path.join(os.path.dirname(__file__), "..")),
+])
+
+from rich import print
+from hooks.server.mavproxy._telemetry import (
+    BinaryTelemetryIndex,
+    TelemetryIndex,
+  )
+
+path = os.path.join(tempfile.mkdtemp(), "tll.csv")
+with open(path, "w") as f:
+  f.write("Timestamp,Latitude,Longitude,Altitude\n")
+
+index = TelemetryIndex(path, capacity=32, window=2.0)
+t0 = time.time()
+for batch in range(5):
+  with open(path, "a") as f:
+    for i in range(10):
+      n = batch * 10 + i
+      row = "%f,%f,%f,%f\n" % (t0 + n * 0.1, 12.0 + n, 77.0 + n, 100.0)
+      if i == 9:
+        # leave the last row half written until the next batch
+        f.write(row[:5])
+        pending = row[5:]
+      elif i == 0 and batch > 0:
+        f.write(pending + row)
+      else:
+        f.write(row)
+  near = index.nearest(t0 + batch * 1.0 + 0.04)
+  interp = index.interpolate(t0 + batch * 1.0 + 0.04)
+  print(f"refresh {batch}: rows={len(index)}, nearest={near}, interpolated={interp}")
+live = index._data[index._start:index._size, 0]
+print(f"window: {index.window}s, held span={live[-1] - live[0]:.2f}s")
+
+t = time.perf_counter()
+for _ in range(10000):
+  index.interpolate(t0 + 4.55)
+print(f"lookup: {(time.perf_counter() - t) / 10000 * 1e6:.1f}us")
+
+bin_path = os.path.join(os.path.dirname(path), "tll.bin")
+record = struct.Struct("<dddd")
+bin_index = BinaryTelemetryIndex(bin_path)
+with open(bin_path, "ab") as f:
+  for n in range(50):
+    f.write(record.pack(t0 + n * 0.1, 12.0 + n, 77.0 + n, 100.0))
+  f.write(record.pack(t0 + 99, 0.0, 0.0, 0.0)[:10])    # torn record
+print(f"binary: rows={bin_index.refresh()}, interpolated={bin_index.interpolate(t0 + 2.04)}")
+t = time.perf_counter()
+for _ in range(10000):
+  bin_index.interpolate(t0 + 4.55)
+print(f"binary lookup: {(time.perf_counter() - t) / 10000 * 1e6:.1f}us")